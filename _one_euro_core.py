@@ -0,0 +1,222 @@
+"""One-Euro滤波的标量内核.
+
+滤波状态以浮点数传递，每帧不创建ndarray；安装了Numba时编译为机器码，
+未安装时作为普通Python函数运行，计算结果一致。
+
+Numba 为可选依赖（pip install numba），未安装时 njit 退化为原样返回函数的占位装饰器，
+prange 退化为 range。
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Numba未安装时的占位装饰器，原样返回被装饰的函数"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# 2π：模块级常量，Numba编译时作为字面量折叠进内核
+_TWO_PI = 2.0 * math.pi
+
+# 实时内核是否已完成预编译
+_warmed_up = False
+
+
+@njit(cache=True, fastmath=True)
+def norm3(v):
+    """三维向量的模长（比 np.linalg.norm 少一次ufunc派发和临时数组）"""
+    return math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
+
+
+@njit(cache=True, fastmath=True)
+def one_euro_step(x0, x1, x2, s0, s1, s2, ds0, ds1, ds2, dt, min_cutoff, beta, d_cutoff):
+    """One-Euro滤波单步更新（调用方保证 dt > 0）
+
+    返回新的状态 (s0, s1, s2, ds0, ds1, ds2)：s为平滑后的位置，ds为平滑后的导数
+    """
+    # 低通系数 alpha = 1 / (1 + tau / dt)，tau = 1 / (2π·cutoff)，
+    # 等价于 2π·dt·cutoff / (1 + 2π·dt·cutoff)，两次计算共用 2π·dt
+    two_pi_dt = _TWO_PI * dt
+
+    # 1. 对导数做低通滤波
+    k = two_pi_dt * d_cutoff
+    a_d = k / (1.0 + k)
+    ds0 = a_d * ((x0 - s0) / dt) + (1.0 - a_d) * ds0
+    ds1 = a_d * ((x1 - s1) / dt) + (1.0 - a_d) * ds1
+    ds2 = a_d * ((x2 - s2) / dt) + (1.0 - a_d) * ds2
+
+    # 2. 速度越快截止频率越高（延迟更小），再对位置做低通滤波
+    cutoff = min_cutoff + beta * math.sqrt(ds0 * ds0 + ds1 * ds1 + ds2 * ds2)
+    k = two_pi_dt * cutoff
+    a = k / (1.0 + k)
+    s0 = a * x0 + (1.0 - a) * s0
+    s1 = a * x1 + (1.0 - a) * s1
+    s2 = a * x2 + (1.0 - a) * s2
+    return s0, s1, s2, ds0, ds1, ds2
+
+
+@njit(cache=True, fastmath=True)
+def step_core(
+    x0, x1, x2, has_prev, l0, l1, l2, v0, v1, v2,
+    s0, s1, s2, ds0, ds1, ds2, filter_dt, dt, is_new,
+    max_jump_sq, min_cutoff, beta, d_cutoff,
+):
+    """实时处理单帧的融合内核：预测残差去噪 -> One-Euro滤波 -> 速度更新
+
+    Args:
+        x: 原始坐标；l: 上一有效帧的平滑坐标（has_prev 为 False 时忽略）
+        v: 速度矢量；s/ds: 滤波状态；filter_dt: 距滤波器上次更新的时间
+        dt: 距上一有效帧的时间步长；is_new: 是否为断流后的新回合
+    Returns:
+        (rejected, s0, s1, s2, ds0, ds1, ds2, v0, v1, v2, speed)：
+        rejected 为 True 表示本帧被判为噪点，此时状态原样返回
+    """
+    # B. 运动模型去噪（仅在连续追踪时生效），比较距离平方，省去开方
+    if has_prev and not is_new:
+        r0 = x0 - (l0 + v0 * dt)
+        r1 = x1 - (l1 + v1 * dt)
+        r2 = x2 - (l2 + v2 * dt)
+        if r0 * r0 + r1 * r1 + r2 * r2 > max_jump_sq:
+            return True, s0, s1, s2, ds0, ds1, ds2, v0, v1, v2, 0.0
+
+    # C/D. 新回合以本帧重新初始化滤波器、速度清零，否则做一步One-Euro滤波
+    if is_new:
+        v0 = v1 = v2 = 0.0
+        s0, s1, s2 = x0, x1, x2
+        ds0 = ds1 = ds2 = 0.0
+    elif filter_dt > 0:
+        s0, s1, s2, ds0, ds1, ds2 = one_euro_step(
+            x0, x1, x2, s0, s1, s2, ds0, ds1, ds2,
+            filter_dt, min_cutoff, beta, d_cutoff,
+        )
+
+    # E. 更新速度矢量
+    speed = 0.0
+    if has_prev and dt > 0:
+        c0 = (s0 - l0) / dt
+        c1 = (s1 - l1) / dt
+        c2 = (s2 - l2) / dt
+        if is_new:
+            v0, v1, v2 = c0, c1, c2
+        else:
+            v0 = 0.8 * c0 + 0.2 * v0
+            v1 = 0.8 * c1 + 0.2 * v1
+            v2 = 0.8 * c2 + 0.2 * v2
+        speed = norm3((v0, v1, v2))
+
+    return False, s0, s1, s2, ds0, ds1, ds2, v0, v1, v2, speed
+
+
+def warmup():
+    """预先编译实时内核 step_core（连同 one_euro_step、norm3），只在首次调用时执行
+
+    njit 在第一次调用时才编译，不预热的话第一条实时LCM消息会在工作线程上承担编译耗时。
+    参数类型与 TrajectoryProcessor.process_realtime_step 的调用一致（全部为float/bool），
+    保证后续调用复用同一份编译结果。未安装Numba时为空操作。
+    """
+    global _warmed_up
+    if _warmed_up or not NUMBA_AVAILABLE:
+        return
+    step_core(
+        0.0, 0.0, 0.0, True, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,
+        0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.033, 0.033, False,
+        1.0, 1.5, 0.15, 1.5,
+    )
+    _warmed_up = True
+
+
+@njit(cache=True, parallel=True)
+def filter_segments(
+    positions, timestamps, seg_bounds,
+    max_jump_sq, timeout, default_dt, min_cutoff, beta, d_cutoff,
+):
+    """按回合分段批量执行实时处理的去噪、滤波和测速
+
+    段内逐帧串行调用 step_core（与 TrajectoryProcessor.process_realtime_step 一致），
+    段与段之间相互独立，用 prange 并行处理。
+
+    Args:
+        positions: (N, 3) float64 原始坐标
+        timestamps: (N,) float64 时间戳
+        seg_bounds: (M+1,) int64 各段的起止下标
+    Returns:
+        filtered: (N, 3) 平滑后的坐标，被判为噪点的帧为NaN
+        speeds: (N,) 速度（噪点帧为0）
+        trend_mask: (N,) 相对上一有效帧Y方向趋势发生变化的帧
+    """
+    n = positions.shape[0]
+    filtered = np.full((n, 3), np.nan)
+    speeds = np.zeros(n)
+    trend_mask = np.zeros(n, dtype=np.bool_)
+
+    for seg in prange(seg_bounds.shape[0] - 1):
+        has_prev = False  # 本段是否已有有效帧
+        last_t = 0.0
+        l0 = l1 = l2 = 0.0  # 上一有效帧的平滑坐标
+        v0 = v1 = v2 = 0.0  # 速度矢量
+        s0 = s1 = s2 = 0.0  # 滤波状态：平滑坐标
+        ds0 = ds1 = ds2 = 0.0  # 滤波状态：平滑导数
+        filter_t = 0.0
+        prev_sign = 2  # 上一次Y方向趋势（-1/0/1），2 表示尚无趋势
+
+        for i in range(seg_bounds[seg], seg_bounds[seg + 1]):
+            x0 = positions[i, 0]
+            x1 = positions[i, 1]
+            x2 = positions[i, 2]
+            t = timestamps[i]
+
+            # A. 时间步长与新回合判定
+            is_new = True
+            dt = default_dt
+            if has_prev:
+                dt = t - last_t
+                if dt > timeout:
+                    dt = default_dt
+                else:
+                    is_new = False
+
+            # B-E. 去噪、滤波、速度更新
+            filter_dt = t - filter_t
+            rejected, s0, s1, s2, ds0, ds1, ds2, v0, v1, v2, speed = step_core(
+                x0, x1, x2, has_prev, l0, l1, l2, v0, v1, v2,
+                s0, s1, s2, ds0, ds1, ds2, filter_dt, dt, is_new,
+                max_jump_sq, min_cutoff, beta, d_cutoff,
+            )
+            if rejected:
+                continue
+            if is_new or filter_dt > 0:
+                filter_t = t
+
+            # F. Y方向趋势变化（相对上一有效帧）
+            if has_prev:
+                dy = s1 - l1
+                if dy > 0:
+                    sign = 1
+                elif dy < 0:
+                    sign = -1
+                else:
+                    sign = 0
+                if prev_sign != 2 and sign != prev_sign:
+                    trend_mask[i] = True
+                prev_sign = sign
+
+            filtered[i, 0] = s0
+            filtered[i, 1] = s1
+            filtered[i, 2] = s2
+            speeds[i] = speed
+            l0, l1, l2 = s0, s1, s2
+            last_t = t
+            has_prev = True
+
+    return filtered, speeds, trend_mask
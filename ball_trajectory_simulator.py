@@ -8,13 +8,22 @@ import csv
 import json
 import logging
 import os
+import queue
+import platform
+import selectors
+import shutil
 import signal
+import struct
 import subprocess
 import sys
 import tempfile
 import threading
 import time
+from contextlib import ExitStack
 from datetime import datetime
+from enum import Enum
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
 
 import numpy as np
 import pyqtgraph as pg
@@ -44,13 +53,72 @@ try:
     # 再尝试导入自定义类型
     import exlcm
     
+    # 预先计算消息fingerprint，解码失败诊断时直接使用
+    _BALL_POS_FINGERPRINT = exlcm.ball_position_t._get_hash_recursive([])
+
     LCM_AVAILABLE = True
     print("✅ LCM库导入成功，实时数据功能可用")
 except ImportError as e:
+    _BALL_POS_FINGERPRINT = None
     LCM_AVAILABLE = False
     print(f"⚠️ LCM库导入失败: {e}")
     print("⚠️ 无法接收实时数据，将使用离线模式")
-from PyQt5.QtCore import QEasingCurve, QPropertyAnimation, Qt, QThread, QTimer, pyqtSignal
+
+# ball_position_t 兼容解码：8字节fingerprint之后为 int64时间戳 + x/y/z 三个double
+_BALL_POS_STRUCT = struct.Struct(">qddd")
+
+# 训练时长存档格式：8字节小端无符号整数（秒）
+_TRAINING_TIME_STRUCT = struct.Struct("<Q")
+
+# 导出时保留的最近速度样本数（环形缓冲，超出自动丢弃最旧数据）
+MAX_SPEED_SAMPLES = 100
+
+# 实时位置/时间戳缓冲的最大长度（定长环形缓冲，内存占用有上限）
+MAX_REALTIME_SAMPLES = 4096
+
+# 导出时保留的最近实时轨迹点数
+MAX_EXPORT_TRAJECTORY_POINTS = 1000
+
+# 去噪平滑缓冲区最大长度（0.1秒延迟窗口在500Hz下约50个点，留足余量）
+MAX_RAW_BUFFER_SAMPLES = 256
+
+# 超过该时长（秒）未收到LCM消息，健康检查即判定连接不活跃
+LCM_SILENCE_THRESHOLD = 10.0
+
+# LCM消息解码失败时，首次记录错误，之后每累计这么多次再汇总记录一次
+LCM_DECODE_ERROR_LOG_EVERY = 1000
+
+# orjson（C扩展）用于数据导出，不可用时回退到标准库json
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# macOS下通过pyobjc在进程内执行AppleScript，避免每次fork osascript
+try:
+    from Foundation import NSAppleScript
+
+    NSAPPLESCRIPT_AVAILABLE = True
+except ImportError:
+    NSAPPLESCRIPT_AVAILABLE = False
+
+# 关闭轨迹模拟器相关Terminal窗口的AppleScript（NSAppleScript预编译与osascript回退共用）
+_CLOSE_TERM_APPLESCRIPT = '''
+tell application "Terminal"
+    repeat with w in windows
+        try
+            set windowName to name of w
+            if windowName contains "trajectory" or windowName contains "simulator" or windowName contains "pingpong" then
+                close w
+                return "Closed window: " & windowName
+            end if
+        end try
+    end repeat
+end tell
+'''
+from PyQt5.QtCore import QEasingCurve, QPoint, QPropertyAnimation, Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QImage, QPixmap
 from PyQt5.QtWidgets import (
     QApplication,
@@ -778,6 +846,9 @@ class SettingsDialog(QDialog):
         self.accept()
 
 class MainWidget(QWidget):
+    # LCM工作线程 -> GUI线程的实时帧信号 (filtered_pos, speed, events)
+    new_frame = pyqtSignal(object, float, object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.menu_btn = None
@@ -790,10 +861,9 @@ class MainWidget(QWidget):
     def resizeEvent(self, event):
         super().resizeEvent(event)
 
-        # 通知父类（BallTrajectorySimulator）更新UI位置
+        # 通知父类（BallTrajectorySimulator）更新UI位置（由其去抖定时器合并处理）
         if hasattr(self, "simulator_instance") and self.simulator_instance:
-            # 延迟调用，确保窗口大小调整完成
-            QTimer.singleShot(50, self.simulator_instance._update_ui_positions)
+            self.simulator_instance.resizeEvent(event)
         else:
             # 如果没有父类引用，使用默认位置（仅作为备用）
             if self.menu_btn:
@@ -815,6 +885,14 @@ class MainWidget(QWidget):
 from .trajectory_processor import TrajectoryProcessor  # 导入新拆分的处理器
 
 
+class LcmState(Enum):
+    """LCM订阅生命周期状态，所有状态转换都在lcm_lock内完成"""
+
+    STOPPED = 0
+    RUNNING = 1
+    RESTARTING = 2
+
+
 class BallTrajectorySimulator:
     """乒乓球轨迹模拟器类.
 
@@ -831,9 +909,24 @@ class BallTrajectorySimulator:
         self.data_source = None  # 当前数据源类型
         self.server_config = None  # 远程服务器配置
 
+        # 实时模式状态（预先初始化，状态查询和实时处理时直接读取属性）
+        self.frame_count = 0
+        self.current_time = 0.0
+        self._realtime_trajectory_index = 0
+        self.prev_realtime_pos = None
+        self.prev_realtime_time = None
+        self.prev_realtime_y_trend = None
+        self._compat_decode_count = 0  # fingerprint不匹配、按兼容结构解码的消息数
+        self._decode_fail_count = 0    # 解码失败被丢弃的消息数
+
         # --- 新增：去噪和平滑缓冲区 ---
-        # self.raw_data_buffer = deque() # 存储 (timestamp, x, y, z)
-        # self.buffer_duration = 0.1     # 0.1秒延迟
+        self.raw_data_buffer = deque(maxlen=MAX_RAW_BUFFER_SAMPLES)  # 存储 (timestamp, x, y, z)
+        # 实时数据缓冲需在 reset_simulator_state() 之前创建，重置时只清空不重建
+        self.real_time_positions = deque(maxlen=MAX_REALTIME_SAMPLES)  # 实时接收的位置数据
+        self.real_time_timestamps = deque(maxlen=MAX_REALTIME_SAMPLES)  # 实时接收的时间戳数据
+        # 导出用轨迹点：实时路径写入滤波后的 (timestamp, x, y, z) 元组，读写都在 _latest_positions_lock 内
+        self.trajectory_points = deque(maxlen=MAX_EXPORT_TRAJECTORY_POINTS)
+        self.buffer_duration = 0.1     # 0.1秒延迟
         self.last_valid_pos = None     # 上一个确认有效的坐标，用于距离过滤
         self.max_jump_distance = 300.0 # 最大允许跳变距离(mm)，超过此值视为误检
         # ---------
@@ -863,8 +956,18 @@ class BallTrajectorySimulator:
         self.on_close_callback = on_close_callback
 
         # LCM线程安全相关变量
-        self.lcm_lock = threading.Lock()  # LCM操作线程锁
-        self.lcm_operation_in_progress = False  # LCM操作进行中标志
+        self.lcm_lock = threading.Lock()  # LCM操作线程锁，保护lcm_state及实例的创建/处理/销毁
+
+        # 平台/桌面环境信息在进程生命周期内不变，初始化时检测一次
+        self._detect_platform()
+
+        # 预编译关闭终端窗口的AppleScript（仅macOS），清理时直接在进程内执行
+        self._close_term_script = None
+        if self._is_mac and NSAPPLESCRIPT_AVAILABLE:
+            self._close_term_script = self._compile_close_term_script()
+
+        # 本实例启动且尚未回收的采集进程PID；非空时清理只针对这些PID，不做系统级扫描
+        self._spawned_pids = set()
 
         # 重置所有状态变量，确保重新打开时状态正确
         self.reset_simulator_state()
@@ -884,6 +987,9 @@ class BallTrajectorySimulator:
         self.is_evaluating_serve = False
         self.serve_data = [] # 存储发球过程的轨迹
 
+        # 最近的击球速度 (板数, 速度)，定长环形缓冲，导出时无需切片
+        self.speed_data = deque(maxlen=MAX_SPEED_SAMPLES)
+
         # 初始化各个模块
         self.interpolator = TrajectoryInterpolator()
         self.landing_analyzer = LandingAnalyzer(save_folder_path)
@@ -900,9 +1006,11 @@ class BallTrajectorySimulator:
         self.lcm_instance = None
         self.lcm_subscription = None
         self.lcm_thread = None
-        self.lcm_running = False
-        self.real_time_positions = []  # 实时接收的位置数据
-        self.real_time_timestamps = []  # 实时接收的时间戳数据
+        self.lcm_state = LcmState.STOPPED
+        self._lcm_sel = None  # 监听LCM套接字可读事件的选择器（epoll/select）
+        # 最近一次收到LCM消息的时间（monotonic），健康检查只读取它，不操作LCM套接字
+        self._last_lcm_msg_ts = 0.0
+        self._lcm_stale = False
 
         # 加载球台角点
         try:
@@ -932,10 +1040,31 @@ class BallTrajectorySimulator:
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_position)
 
+        # 实时渲染：LCM线程只缓存新位置，由固定频率(~60FPS)定时器统一重绘
+        self._latest_positions = deque(maxlen=64)
+        self._latest_positions_lock = threading.Lock()
+        # 有新位置待绘制的标志：定时器空转时无需加锁即可直接返回
+        self._plot_dirty = False
+        self._render_timer = QTimer()
+        self._render_timer.timeout.connect(self._render_tick)
+        # 图表脏标志：事件只置位，由10Hz单次定时器统一重绘，突发事件在100ms内只重绘一次
+        self._speed_dirty = False
+        self._heatmap_dirty = False
+        self._scatter_dirty = False
+        self._chart_timer = QTimer()
+        self._chart_timer.setSingleShot(True)
+        self._chart_timer.timeout.connect(self._flush_dirty_charts)
+
         # 创建主窗口
         self.main_widget = MainWidget()
+        # 窗口缩放去抖：拖动过程中反复重启，只在最后一次缩放后执行布局更新
+        self._resize_timer = QTimer(self.main_widget)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.timeout.connect(self._do_resize_work)
         # 设置对模拟器的引用，用于resizeEvent
         self.main_widget.simulator_instance = self
+        # 实时帧的界面刷新通过排队连接在GUI线程执行
+        self.main_widget.new_frame.connect(self._on_new_frame)
         self.layout = QVBoxLayout(self.main_widget)
         self.layout.setContentsMargins(0, 0, 0, 0)
         self.layout.addWidget(self.plt.view)
@@ -1132,6 +1261,16 @@ class BallTrajectorySimulator:
         self.eval_serve_btn.show()
         self.main_widget.eval_serve_btn = self.eval_serve_btn # 保存引用
 
+        # 左侧按钮列（自上而下，间距50px），供_update_ui_positions批量定位
+        self._left_column_buttons = [
+            self.local_monitor_btn,
+            self.local_trajectory_btn,
+            self.record_btn,
+            self.realtime_render_btn,
+            self.reset_charts_btn,
+            self.eval_serve_btn,
+        ]
+
         # 在 eval_serve_btn 下方添加一个查看分布的按钮
         self.view_stats_btn = QPushButton("Serve History", self.main_widget)
         self.view_stats_btn.setStyleSheet(self.local_monitor_btn.styleSheet()) # 复用样式
@@ -1290,6 +1429,7 @@ class BallTrajectorySimulator:
         self.training_start_time = time.time()  # 程序启动时间作为训练开始时间
         self.total_training_time = 0  # 总训练时长（秒）
         self.last_save_time = time.time()  # 上次保存时间
+        self._last_validate_ts = 0.0  # 上次验证训练时长的时间（monotonic）
         
         # 加载累积的训练时长
         self.load_accumulated_training_time()
@@ -1465,12 +1605,13 @@ class BallTrajectorySimulator:
         self.playback_index = 0
 
         # 重置实时数据
-        self.real_time_positions = []
-        self.real_time_timestamps = []
+        self.real_time_positions.clear()
+        self.real_time_timestamps.clear()
+        self.trajectory_points.clear()
         self._realtime_trajectory_index = 0
 
         # 重置LCM状态
-        self.lcm_running = False
+        self.lcm_state = LcmState.STOPPED
 
         # 重置录制状态
         self.is_recording = False
@@ -1484,7 +1625,7 @@ class BallTrajectorySimulator:
             training_time_str = self.get_formatted_training_time()
             
             # 简化的数值验证
-            if not isinstance(speed, (int, float)) or np.isnan(speed) or np.isinf(speed):
+            if not isinstance(speed, (int, float)) or math.isnan(speed) or math.isinf(speed):
                 speed = 0.0
                 
             if not isinstance(shot_count, int) or shot_count < 0:
@@ -1542,9 +1683,7 @@ class BallTrajectorySimulator:
                 os.makedirs(self.save_folder_path, exist_ok=True)
 
                 # 保存累计训练时长（秒）
-                training_file = os.path.join(self.save_folder_path, "training_time.txt")
-                with open(training_file, "w", encoding="utf-8") as f:
-                    f.write(str(int(self.total_training_time)))
+                self._write_training_time(self.total_training_time)
 
                 print(f"💾 训练时长已保存到存档: {self.total_training_time:.1f}秒")
         except Exception as e:
@@ -1864,6 +2003,7 @@ class BallTrajectorySimulator:
                     return
 
                 # 启动成功
+                self._spawned_pids.add(self.collection_process.pid)
                 self.data_source = "local_monitor"
                 self.button_frame.hide()
 
@@ -2182,10 +2322,7 @@ class BallTrajectorySimulator:
         self.trajectory_index = 0
         if hasattr(self, "start_time"):
             delattr(self, "start_time")
-        self.plt.pos_list = [
-            np.full([3], None) for _ in range(self.plt.pos_list_memory_lenth)
-        ]
-        self.plt.n = 0
+        self._clear_plot_buffer()
         self.plt.updatePlot()
         self.load_positions()
         self.start()  # 刷新后自动播放（保持累积的板数和回合数）
@@ -2221,47 +2358,23 @@ class BallTrajectorySimulator:
             # 重置训练计时器
             self.reset_training_timer()
 
-            # 清理落地数据文件
-            if self.save_folder_path:
-                landing_file = os.path.join(
-                    self.save_folder_path, "landing_data", "landing_data.csv"
-                )
-            else:
-                landing_file = os.path.join("landing_data", "landing_data.csv")
-
-            if os.path.exists(landing_file):
-                # 备份原文件（可选）
-                backup_file = landing_file.replace(
-                    ".csv", f"_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                )
-                os.rename(landing_file, backup_file)
-                print(f"📁 落地数据已备份到: {backup_file}")
-
-            # 清理球速数据文件
-            if self.save_folder_path:
-                speed_file = os.path.join(
-                    self.save_folder_path, "speed_data", "speed_data.csv"
-                )
-            else:
-                speed_file = os.path.join("speed_data", "speed_data.csv")
-
-            if os.path.exists(speed_file):
-                # 备份原文件（可选）
-                backup_file = speed_file.replace(
-                    ".csv", f"_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                )
-                os.rename(speed_file, backup_file)
-                print(f"📁 球速数据已备份到: {backup_file}")
+            # 清理落地数据文件、球速数据文件（备份原文件）
+            backup_suffix = f"_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            for data_file, label in (
+                (self._p_landing_csv, "落地数据"),
+                (self._p_speed_csv, "球速数据"),
+            ):
+                if data_file.is_file():
+                    backup_file = data_file.with_name(data_file.stem + backup_suffix)
+                    data_file.rename(backup_file)
+                    print(f"📁 {label}已备份到: {backup_file}")
 
             # 重新初始化数据记录
             self.landing_analyzer.init_landing_data_recording()
             self.trajectory_recorder.init_speed_data_recording()
 
             # 重置3D可视化
-            self.plt.pos_list = [
-                np.full([3], None) for _ in range(self.plt.pos_list_memory_lenth)
-            ]
-            self.plt.n = 0
+            self._clear_plot_buffer()
             self.plt.updatePlot()
 
             # 更新热力图、散点图和速度图表显示
@@ -2535,7 +2648,7 @@ class BallTrajectorySimulator:
             # 更新有效点记录
             self.last_valid_pos = raw_pos
             self.current_time = current_time
-            self.frame_count = getattr(self, 'frame_count', 0) + 1
+            self.frame_count += 1
 
             # 2. 计算速度与趋势分析
             if hasattr(self, "prev_realtime_pos") and self.prev_realtime_pos is not None:
@@ -2561,13 +2674,13 @@ class BallTrajectorySimulator:
                 # addNewBall 仅添加数据点，更新非常快
                 self.plt.addNewBall(raw_pos)
                 # 渲染绘制：控制在约 60FPS 左右（假设数据源为 100Hz+，则隔帧绘制）
-                if self.frame_count % 2 == 0:
+                if not (self.frame_count & 1):
                     self.plt.updatePlot()
 
             # 更新历史状态
             self.prev_realtime_pos = raw_pos.copy()
             self.prev_realtime_time = current_time
-            self._realtime_trajectory_index = getattr(self, "_realtime_trajectory_index", 0) + 1
+            self._realtime_trajectory_index += 1
 
         except Exception as e:
             print(f"❌ 实时位置处理失败: {e}")
@@ -2671,8 +2784,7 @@ class BallTrajectorySimulator:
                         # 更新前一个Y轴趋势
                         self.prev_realtime_y_trend = current_y_trend
                 
-                self.update_heatmap_display()
-                self.update_scatter_display()
+                self._mark_charts_dirty(landing=True)
 
         except Exception as e:
             print(f"❌ 实时落点分析失败: {e}")
@@ -2684,8 +2796,29 @@ class BallTrajectorySimulator:
         self.landing_analyzer.record_landing_point(timestamp, position)
 
         # 自动刷新热力图和散点图
-        self.update_heatmap_display()
-        self.update_scatter_display()
+        self._mark_charts_dirty(landing=True)
+
+    def _mark_charts_dirty(self, speed=False, landing=False):
+        """标记需要重绘的图表，100ms内的多次请求合并为一次绘制"""
+        if speed:
+            self._speed_dirty = True
+        if landing:
+            self._heatmap_dirty = True
+            self._scatter_dirty = True
+        if not self._chart_timer.isActive():
+            self._chart_timer.start(100)
+
+    def _flush_dirty_charts(self):
+        """图表定时器回调：只重绘被标记的图表"""
+        if self._speed_dirty:
+            self._speed_dirty = False
+            self.update_speed_chart()
+        if self._heatmap_dirty:
+            self._heatmap_dirty = False
+            self.update_heatmap_display()
+        if self._scatter_dirty:
+            self._scatter_dirty = False
+            self.update_scatter_display()
 
     def toggle_recording(self):
         """切换录制状态"""
@@ -3587,14 +3720,6 @@ class BallTrajectorySimulator:
             self.update_heatmap_display()
             self.update_scatter_display()
 
-    def cleanup(self):
-        """清理资源."""
-        if self.is_recording:
-            self.stop_recording()
-
-        # 关闭采集程序进程 - 使用简洁的endprocess方式
-        self._force_kill_collection_process()
-
     def _force_kill_collection_process(self):
         """强制终止采集程序进程 - 类似系统监视器的endprocess"""
         if not hasattr(self, "collection_process") or not self.collection_process:
@@ -3621,6 +3746,7 @@ class BallTrajectorySimulator:
                     print("✅ 进程已不存在")
             
             # 清空进程引用
+            self._spawned_pids.discard(pid)
             self.collection_process = None
             
         except Exception as e:
@@ -3628,55 +3754,52 @@ class BallTrajectorySimulator:
             # 最后尝试系统级清理
             self._cleanup_all_trajectory_simulators()
 
-    def _cleanup_all_trajectory_simulators(self):
-        """系统级清理所有轨迹模拟器进程"""
-        try:
-            import psutil
-            
-            # 查找所有trajectory_sender进程
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    if proc.info['name'] and 'trajectory_sender' in proc.info['name']:
-                        print(f"🔍 发现轨迹模拟器进程: PID={proc.info['pid']}, 名称={proc.info['name']}")
-                        proc.kill()  # 直接使用kill()强制终止
-                        print(f"✅ 已强制终止进程 PID={proc.info['pid']}")
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired):
-                    pass
-                    
-        except ImportError:
-            print("⚠️ psutil库不可用，跳过系统级进程清理")
-        except Exception as e:
-            print(f"⚠️ 系统级进程清理失败: {e}")
-        
-        # 清理可能存在的终端窗口
-        self._cleanup_terminal_windows()
-
-        # 关闭落点数据记录
-        self.landing_analyzer.close_landing_data_recording()
-
-        # 关闭球速数据记录
-        self.trajectory_recorder.close_speed_data_recording()
-
-        # 关闭轨迹数据记录
-        self.trajectory_recorder.close_trajectory_data_recording()
+    def _signal_spawned_process(self, pid, sig):
+        """向本实例启动的进程发送信号；以setsid启动的进程连同其进程组一起发送"""
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(pid, sig)
+                return
+            except (ProcessLookupError, PermissionError):
+                pass
+        os.kill(pid, sig)
 
-        # 停止训练定时器
-        if hasattr(self, "training_timer") and self.training_timer.isActive():
-            self.training_timer.stop()
-            print("⏹️ 训练定时器已停止")
+    def _kill_spawned_pids(self):
+        """只终止本实例启动的进程：先SIGTERM，短暂等待后对仍未退出的进程SIGKILL"""
+        for pid in list(self._spawned_pids):
+            try:
+                self._signal_spawned_process(pid, signal.SIGTERM)
+                print(f"🔄 清理进程 PID: {pid}")
+            except ProcessLookupError:
+                self._spawned_pids.discard(pid)
 
-        # 清理3D可视化资源
-        if hasattr(self, "plt") and hasattr(self.plt, "cleanup"):
-            self.plt.cleanup()
+        if not self._spawned_pids:
+            print("✅ 本实例启动的进程均已退出")
+            return
 
-        try:
-            logger.info("Simulation completed and resources cleaned up")
-        except Exception as e:
-            logger.error(f"Error during cleanup: {str(e)}")
-            raise
+        time.sleep(0.2)
+        for pid in list(self._spawned_pids):
+            try:
+                reaped_pid, _ = os.waitpid(pid, os.WNOHANG)
+                if reaped_pid == 0:
+                    self._signal_spawned_process(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                    print(f"✅ 进程 {pid} 已强制关闭")
+                else:
+                    print(f"✅ 进程 {pid} 已正常关闭")
+            except (ChildProcessError, ProcessLookupError):
+                # 已被Popen回收或已不存在
+                print(f"🔍 进程 {pid} 已不存在")
+            self._spawned_pids.discard(pid)
 
     def _cleanup_all_trajectory_simulators(self):
         """系统级清理所有轨迹模拟器进程"""
+        # 本实例启动的进程仍有记录时，直接终止这些PID，跳过pgrep/wmctrl/AppleScript扫描；
+        # 记录为空（进程已全部回收）时回退到系统级扫描
+        if self._spawned_pids:
+            self._kill_spawned_pids()
+            return
+
         try:
             print("🔄 执行系统级轨迹模拟器进程清理...")
             
@@ -3739,10 +3862,7 @@ class BallTrajectorySimulator:
             print("🔄 检查并清理可能的终端进程...")
             try:
                 # 方法1: 查找包含 trajectory_simulator 相关的终端进程
-                import platform
-                system = platform.system()
-                
-                if system == "Darwin":  # macOS
+                if self._is_mac:  # macOS
                     terminal_patterns = [
                         'Terminal.*trajectory_simulator',
                         'iTerm.*trajectory_simulator',
@@ -3783,10 +3903,7 @@ class BallTrajectorySimulator:
                 try:
                     # 获取当前用户的所有终端进程
                     # 根据操作系统使用不同的终端应用名称
-                    import platform
-                    system = platform.system()
-                    
-                    if system == "Darwin":  # macOS
+                    if self._is_mac:  # macOS
                         # macOS 常见终端应用
                         terminal_pattern = '(Terminal|iTerm|iTerm2|Hyper|Alacritty)'
                     else:  # Linux 和其他系统
@@ -3807,10 +3924,7 @@ class BallTrajectorySimulator:
                                 pid = int(pid_str)
                                 # 检查进程的命令行参数和子进程
                                 # macOS 和 Linux 的 ps 命令参数略有不同
-                                import platform
-                                system = platform.system()
-                                
-                                if system == "Darwin":  # macOS
+                                if self._is_mac:  # macOS
                                     ps_cmd = ['ps', '-p', str(pid), '-o', 'command']
                                 else:  # Linux 和其他系统
                                     ps_cmd = ['ps', '-p', str(pid), '-o', 'cmd', '--no-headers']
@@ -3866,50 +3980,57 @@ class BallTrajectorySimulator:
             except Exception as final_error:
                 print(f"❌ 最终清理也失败: {final_error}")
     
+    def _detect_platform(self):
+        """检测平台、窗口管理工具和桌面环境，结果缓存供清理流程使用"""
+        self._is_mac = platform.system() == "Darwin"
+        self._has_wmctrl = shutil.which("wmctrl") is not None
+        self._desktop_session = os.environ.get("DESKTOP_SESSION", "").lower()
+        self._desktop_env = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
+        self._is_gnome = "gnome" in self._desktop_session or "gnome" in self._desktop_env
+
+    def _compile_close_term_script(self):
+        """预编译关闭终端窗口的AppleScript，失败时返回None（回退到osascript）"""
+        try:
+            script = NSAppleScript.alloc().initWithSource_(_CLOSE_TERM_APPLESCRIPT)
+            compiled, error = script.compileAndReturnError_(None)
+            if not compiled:
+                print(f"⚠️ AppleScript 预编译失败: {error}")
+                return None
+            return script
+        except Exception as e:
+            print(f"⚠️ AppleScript 预编译失败: {e}")
+            return None
+
     def _cleanup_terminal_windows(self):
         """清理可能存在的终端窗口"""
         try:
             print("🔄 检查并清理终端窗口...")
             
             # 方法1: 使用平台特定的窗口管理工具
-            import platform
-            system = platform.system()
-            
             try:
-                if system == "Darwin":  # macOS
+                if self._is_mac:  # macOS
                     # macOS 使用 AppleScript 查找和关闭窗口
                     print("🔍 使用 AppleScript 查找相关终端窗口...")
                     try:
-                        # 查找 Terminal 应用中包含相关内容的窗口
-                        applescript_cmd = '''
-                        tell application "Terminal"
-                            repeat with w in windows
-                                try
-                                    set windowName to name of w
-                                    if windowName contains "trajectory" or windowName contains "simulator" or windowName contains "pingpong" then
-                                        close w
-                                        return "Closed window: " & windowName
-                                    end if
-                                end try
-                            end repeat
-                        end tell
-                        '''
-                        
-                        result = subprocess.run(['osascript', '-e', applescript_cmd], 
-                                              capture_output=True, text=True, timeout=5)
-                        
-                        if result.returncode == 0 and result.stdout.strip():
-                            print(f"✅ {result.stdout.strip()}")
-                        
+                        if self._close_term_script is not None:
+                            # 使用预编译的AppleScript在进程内执行，无需fork和重新编译
+                            result, error = self._close_term_script.executeAndReturnError_(None)
+                            if error is None and result is not None and result.stringValue():
+                                print(f"✅ {result.stringValue()}")
+                        else:
+                            # 查找 Terminal 应用中包含相关内容的窗口
+                            result = subprocess.run(['osascript', '-e', _CLOSE_TERM_APPLESCRIPT],
+                                                  capture_output=True, text=True, timeout=5)
+
+                            if result.returncode == 0 and result.stdout.strip():
+                                print(f"✅ {result.stdout.strip()}")
+
                     except Exception as e:
                         print(f"🔍 AppleScript 终端窗口管理失败: {e}")
                         
                 else:  # Linux 和其他系统
-                    # 检查是否有 wmctrl 工具
-                    wmctrl_check = subprocess.run(['which', 'wmctrl'], 
-                                                capture_output=True, text=True, timeout=2)
-                    
-                    if wmctrl_check.returncode == 0:
+                    # 检查是否有 wmctrl 工具（初始化时已检测）
+                    if self._has_wmctrl:
                         print("🔍 使用 wmctrl 查找相关终端窗口...")
                         
                         # 查找包含 trajectory_simulator 的窗口
@@ -3937,13 +4058,10 @@ class BallTrajectorySimulator:
             
             # 方法2: 检查当前桌面环境的终端管理器
             try:
-                desktop_env = os.environ.get('DESKTOP_SESSION', '').lower()
-                xdg_current_desktop = os.environ.get('XDG_CURRENT_DESKTOP', '').lower()
-                
-                print(f"🔍 检测到桌面环境: {desktop_env}, {xdg_current_desktop}")
+                print(f"🔍 检测到桌面环境: {self._desktop_session}, {self._desktop_env}")
                 
                 # 对于 GNOME 环境
-                if 'gnome' in desktop_env or 'gnome' in xdg_current_desktop:
+                if self._is_gnome:
                     try:
                         # 尝试通过 dbus 获取 gnome-terminal 信息
                         result = subprocess.run([
@@ -3987,30 +4105,29 @@ class BallTrajectorySimulator:
             )
             
             if file_path:
+                # 轨迹点快照：最近MAX_EXPORT_TRAJECTORY_POINTS个点一次性转为 (N, 4) 数组，
+                # 避免逐点构造字典；时间戳为epoch秒，使用float64以免丢失精度
+                with self._latest_positions_lock:
+                    trajectory_points = list(self.trajectory_points)
+                trajectory_arr = np.asarray(trajectory_points, dtype=np.float64).reshape(-1, 4)
+
                 # 收集当前数据
                 export_data = {
                     "timestamp": timestamp,
-                    "trajectory_points": len(self.trajectory_points) if hasattr(self, 'trajectory_points') else 0,
+                    "trajectory_points": len(trajectory_arr),
                     "speed_data": [],
                     "landing_points": [],
                     "statistics": {}
                 }
                 
                 # 导出轨迹点数据
-                if hasattr(self, 'trajectory_points') and self.trajectory_points:
-                    export_data["trajectory_data"] = [
-                        {
-                            "timestamp": point[0] if isinstance(point, (list, tuple)) else point.get('timestamp', 0),
-                            "x": point[1] if isinstance(point, (list, tuple)) else point.get('x', 0),
-                            "y": point[2] if isinstance(point, (list, tuple)) else point.get('y', 0),
-                            "z": point[3] if isinstance(point, (list, tuple)) else point.get('z', 0)
-                        }
-                        for point in self.trajectory_points[:1000]  # 限制导出前1000个点
-                    ]
+                if len(trajectory_arr):
+                    export_data["trajectory_columns"] = ["timestamp", "x", "y", "z"]
+                    export_data["trajectory_data"] = trajectory_arr
                 
                 # 导出速度数据
-                if hasattr(self, 'speed_data') and self.speed_data:
-                    export_data["speed_data"] = self.speed_data[-100:]  # 最近100个速度数据
+                if self.speed_data:
+                    export_data["speed_data"] = list(self.speed_data)  # 最近MAX_SPEED_SAMPLES个速度数据
                 
                 # 导出落点数据
                 if hasattr(self, 'landing_analyzer') and hasattr(self.landing_analyzer, 'landing_points'):
@@ -4028,18 +4145,30 @@ class BallTrajectorySimulator:
                     }
                 
                 # 写入文件
-                import json
                 if file_path.endswith('.json'):
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(export_data, f, indent=2, ensure_ascii=False)
+                    if ORJSON_AVAILABLE:
+                        # orjson 直接输出UTF-8字节，ndarray 无需逐元素转换
+                        data_bytes = orjson.dumps(
+                            export_data,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                        )
+                        with open(file_path, 'wb') as f:
+                            f.write(data_bytes)
+                    else:
+                        with open(file_path, 'w', encoding='utf-8') as f:
+                            json.dump(export_data, f, indent=2, ensure_ascii=False,
+                                      default=lambda o: o.tolist())
                 elif file_path.endswith('.csv'):
-                    # CSV 格式导出轨迹数据
-                    import csv
-                    with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(['timestamp', 'x', 'y', 'z'])
-                        for point in export_data.get("trajectory_data", []):
-                            writer.writerow([point['timestamp'], point['x'], point['y'], point['z']])
+                    # CSV 格式导出轨迹数据：(N, 4) 数组一次写出
+                    np.savetxt(
+                        file_path,
+                        trajectory_arr,
+                        fmt="%.6f",
+                        delimiter=",",
+                        header="timestamp,x,y,z",
+                        comments="",
+                        encoding="utf-8",
+                    )
                 
                 logger.info(f"数据导出成功: {file_path}")
                 QMessageBox.information(
@@ -4061,23 +4190,25 @@ class BallTrajectorySimulator:
             )
 
     def resizeEvent(self, event):
-        """处理窗口大小改变事件"""
-        super().resizeEvent(event)
+        """处理窗口大小改变事件（由MainWidget转发）"""
+        # 等待窗口大小调整完成：重启单次定时器，连续缩放只触发一次布局更新
+        self._resize_timer.start(100)
 
+    def _do_resize_work(self):
+        """窗口缩放结束后更新球台大小和UI位置"""
         print(
-            f"🔄 窗口大小改变事件触发: {event.size().width()}x{event.size().height()}"
+            f"🔄 窗口大小改变: {self.main_widget.width()}x{self.main_widget.height()}"
         )
 
-        # 等待窗口大小调整完成
-        QTimer.singleShot(100, self._update_ui_positions)
-
         # 更新球台大小
         self.update_table_size()
-        # 更新视图
-        self.update()
+        # 更新UI位置（内部会统一刷新一次视图）
+        self._update_ui_positions()
 
     def _update_ui_positions(self):
         """更新UI元素位置"""
+        # 暂停重绘，所有位置更新完成后统一刷新一次
+        self.main_widget.setUpdatesEnabled(False)
         try:
             # 获取当前窗口尺寸
             window_width = self.main_widget.width()
@@ -4089,36 +4220,27 @@ class BallTrajectorySimulator:
             margin = 30
             chart_height = 300
 
-            # 1. 左侧按钮区域（左上角）
-            self.local_monitor_btn.move(margin, margin)
-            self.local_trajectory_btn.move(margin, margin + 50)
-            self.record_btn.move(margin, margin + 100)
-            self.realtime_render_btn.move(margin, margin + 150)
-            self.reset_charts_btn.move(margin, margin + 200)
-
-            # [新增] 发球评估按钮的位置 (在 reset_charts_btn 下方 50px)
-            if hasattr(self, 'eval_serve_btn'):
-                self.eval_serve_btn.move(margin, margin + 250)
+            # 1. 左侧按钮区域（左上角），包括发球评估按钮
+            for i, btn in enumerate(self._left_column_buttons):
+                self._move_widget(btn, margin, margin + 50 * i)
 
             # 2. 右侧控制区域（右上角）
             # 按钮框架
-            self.button_frame.move(
+            self._move_widget(
+                self.button_frame,
                 window_width - self.button_frame.width() - margin,
                 window_height - self.button_frame.height() - margin,
             )
 
             # 球速标签（屏幕中间，距离上边80px）
             speed_label_x = (window_width - self.speed_label.width()) // 2
-            self.speed_label.move(speed_label_x, 80)
+            self._move_widget(self.speed_label, speed_label_x, 80)
             print(f"📍 球速标签位置: ({speed_label_x}, 80), 宽度: {self.speed_label.width()}")
 
             # 速度折线图（屏幕右上方，距离边30px）
-            self.speed_chart_label.move(
-                window_width - self.speed_chart_label.width() - margin, margin
-            )
-            print(
-                f"📍 速度趋势图位置: ({window_width - self.speed_chart_label.width() - margin}, {margin})"
-            )
+            speed_chart_x = window_width - self.speed_chart_label.width() - margin
+            self._move_widget(self.speed_chart_label, speed_chart_x, margin)
+            print(f"📍 速度趋势图位置: ({speed_chart_x}, {margin})")
 
             # 3. 底部图表区域（左下角）
             # 计算图表区域的Y坐标，确保贴底边
@@ -4130,12 +4252,12 @@ class BallTrajectorySimulator:
 
             # 散点图（左侧）
             scatter_x = margin
-            self.scatter_canvas.move(scatter_x, chart_area_y)
+            self._move_widget(self.scatter_canvas, scatter_x, chart_area_y)
             print(f"📍 散点图位置: ({scatter_x}, {chart_area_y})")
 
             # 热力图（散点图右侧，间隔margin）
             heatmap_x = scatter_x + self.scatter_canvas.width() + margin
-            self.heatmap_canvas.move(heatmap_x, chart_area_y)
+            self._move_widget(self.heatmap_canvas, heatmap_x, chart_area_y)
             print(f"📍 热力图位置: ({heatmap_x}, {chart_area_y})")
 
             print(f"✅ UI位置更新完成")
@@ -4143,6 +4265,16 @@ class BallTrajectorySimulator:
         except Exception as e:
             print(f"❌ 更新UI位置失败: {e}")
             logger.error(f"Failed to update UI positions: {str(e)}")
+        finally:
+            self.main_widget.setUpdatesEnabled(True)
+            self.main_widget.update()
+
+    @staticmethod
+    def _move_widget(widget, x, y):
+        """仅在位置变化时移动控件，避免无谓的moveEvent和重绘"""
+        new_pos = QPoint(x, y)
+        if widget.pos() != new_pos:
+            widget.move(new_pos)
 
     def _force_refresh_layout(self):
         """强制刷新布局"""
@@ -4167,6 +4299,23 @@ class BallTrajectorySimulator:
             print(f"❌ 强制刷新布局失败: {e}")
             logger.error(f"Failed to force refresh layout: {str(e)}")
 
+    @property
+    def save_folder_path(self):
+        """存档文件夹路径"""
+        return self._save_folder_path
+
+    @save_folder_path.setter
+    def save_folder_path(self, value):
+        """设置存档文件夹路径，并一次性计算存档内各数据文件的路径"""
+        self._save_folder_path = value
+        base_dir = Path(value) if value else Path(".")
+        # 训练时长只保存在指定的存档中，没有存档路径时为None；
+        # 二进制格式使用 .bin，旧版文本格式的 .txt 只在迁移时读取
+        self._p_training_time = base_dir / "training_time.bin" if value else None
+        self._p_training_time_legacy = base_dir / "training_time.txt" if value else None
+        self._p_speed_csv = base_dir / "speed_data" / "speed_data.csv"
+        self._p_landing_csv = base_dir / "landing_data" / "landing_data.csv"
+
     def load_accumulated_training_time(self):
         """从存档加载累积的训练时长"""
         try:
@@ -4174,17 +4323,23 @@ class BallTrajectorySimulator:
                 print("⚠️ 未指定存档路径，训练时长从0开始")
                 return
                 
-            training_file = os.path.join(self.save_folder_path, "training_time.txt")
-            
-            if os.path.exists(training_file):
-                with open(training_file, "r", encoding="utf-8") as f:
-                    content = f.read().strip()
-                    if content and content.isdigit():
-                        self.total_training_time = int(content)
-                        print(f"⏱️ 加载累积训练时长: {self.total_training_time}秒")
-                    else:
-                        print("⚠️ 训练时长文件格式错误，从0开始")
-                        self.total_training_time = 0
+            if self._p_training_time.is_file():
+                content = self._p_training_time.read_bytes()
+                if len(content) == _TRAINING_TIME_STRUCT.size:
+                    (self.total_training_time,) = _TRAINING_TIME_STRUCT.unpack(content)
+                    print(f"⏱️ 加载累积训练时长: {self.total_training_time}秒")
+                else:
+                    print("⚠️ 训练时长文件格式错误，从0开始")
+                    self.total_training_time = 0
+            elif self._p_training_time_legacy.is_file():
+                # 兼容旧版文本格式存档，下次保存时写入二进制格式的 .bin 文件
+                content = self._p_training_time_legacy.read_text(encoding="utf-8").strip()
+                if content.isdigit():
+                    self.total_training_time = int(content)
+                    print(f"⏱️ 从旧版存档加载累积训练时长: {self.total_training_time}秒")
+                else:
+                    print("⚠️ 训练时长文件格式错误，从0开始")
+                    self.total_training_time = 0
             else:
                 print("⏱️ 训练时长文件不存在，从0开始")
                 self.total_training_time = 0
@@ -4197,22 +4352,20 @@ class BallTrajectorySimulator:
     def load_accumulated_shot_count(self):
         """加载累积的板数数据，从speed_data文件读取"""
         try:
-            if self.save_folder_path:
-                speed_file = os.path.join(
-                    self.save_folder_path, "speed_data", "speed_data.csv"
-                )
-            else:
-                speed_file = os.path.join("speed_data", "speed_data.csv")
-
-            if os.path.exists(speed_file):
-                # 读取CSV文件，获取最大的板数
-                max_shot_count = 0
-                with open(speed_file, "r", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if "shot_count" in row and row["shot_count"].isdigit():
-                            shot_count = int(row["shot_count"])
-                            max_shot_count = max(max_shot_count, shot_count)
+            speed_file = self._p_speed_csv
+
+            if speed_file.is_file():
+                # 板数在记录过程中单调不减，直接读取文件末行即可得到最大板数
+                max_shot_count = self._read_last_shot_count(speed_file)
+                if max_shot_count is None:
+                    # 末行无法解析时退回全量扫描CSV文件，获取最大的板数
+                    max_shot_count = 0
+                    with open(speed_file, "r", encoding="utf-8") as f:
+                        reader = csv.DictReader(f)
+                        for row in reader:
+                            if "shot_count" in row and row["shot_count"].isdigit():
+                                shot_count = int(row["shot_count"])
+                                max_shot_count = max(max_shot_count, shot_count)
 
                 # 设置累积的板数
                 if max_shot_count > 0:
@@ -4227,6 +4380,39 @@ class BallTrajectorySimulator:
             print(f"❌ 加载累积板数失败: {e}")
             logger.error(f"Failed to load accumulated shot count: {str(e)}")
 
+    def _read_last_shot_count(self, speed_file):
+        """从speed_data文件末尾读取最后一行的板数，无法解析时返回None"""
+        with open(speed_file, "rb") as f:
+            header = f.readline().decode("utf-8-sig").strip().split(",")
+            if "shot_count" not in header:
+                return None
+            shot_idx = header.index("shot_count")
+
+            # 只读取最后4KB，足以包含完整的末行
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 4096))
+            tail = f.read().decode("utf-8", errors="ignore")
+
+        last_line = tail.rstrip().rsplit("\n", 1)[-1].strip()
+        fields = last_line.split(",")
+        if fields == header:
+            return 0  # 只有表头，没有数据行
+        if len(fields) != len(header) or not fields[shot_idx].isdigit():
+            return None
+        return int(fields[shot_idx])
+
+    def _clear_plot_buffer(self):
+        """清空3D视图的点缓冲区
+
+        plot3D（外部模块）的 addNewBall/updatePlot 以 np.full([3], None) 行表示空位，
+        这里必须保持同样的列表结构，不能换成NaN填充的数组
+        """
+        self.plt.pos_list = [
+            np.full([3], None) for _ in range(self.plt.pos_list_memory_lenth)
+        ]
+        self.plt.n = 0
+
     def reset_playback_state(self):
         """重置播放状态但不重置累积数据"""
         try:
@@ -4238,10 +4424,7 @@ class BallTrajectorySimulator:
             self.complete_trajectory = []
 
             # 重置3D可视化
-            self.plt.pos_list = [
-                np.full([3], None) for _ in range(self.plt.pos_list_memory_lenth)
-            ]
-            self.plt.n = 0
+            self._clear_plot_buffer()
             self.plt.updatePlot()
 
             # 更新热力图、散点图和速度图表显示
@@ -4278,6 +4461,11 @@ class BallTrajectorySimulator:
         self.offset_x = (self.main_widget.width() - display_width) / 2
         self.offset_y = (self.main_widget.height() - display_height) / 2
 
+    @property
+    def lcm_running(self):
+        """LCM订阅是否处于运行（含重建中）状态"""
+        return self.lcm_state is not LcmState.STOPPED
+
     def start_lcm_subscription(self):
         """启动LCM订阅，接收实时球位置数据"""
         if not LCM_AVAILABLE:
@@ -4285,19 +4473,32 @@ class BallTrajectorySimulator:
             return
 
         try:
-            # 创建LCM实例
-            self.lcm_instance = lcm.LCM()
+            with self.lcm_lock:
+                # 已在运行时重复启动为空操作
+                if self.lcm_state is not LcmState.STOPPED:
+                    return
 
-            # 订阅球位置数据通道
-            self.lcm_subscription = self.lcm_instance.subscribe(
-                "EXAMPLE", self._handle_lcm_message
-            )
+                # 创建LCM实例
+                self.lcm_instance = lcm.LCM()
+                self._register_lcm_selector()
+
+                # 订阅球位置数据通道
+                self.lcm_subscription = self.lcm_instance.subscribe(
+                    "EXAMPLE", self._handle_lcm_message
+                )
+                self.lcm_state = LcmState.RUNNING
 
             # 启动LCM处理线程
-            self.lcm_running = True
             self.lcm_thread = threading.Thread(target=self._lcm_worker, daemon=True)
             self.lcm_thread.start()
 
+            # 启动实时渲染定时器（约60FPS，与LCM消息频率解耦）
+            self._render_timer.start(16)
+
+            # 静默时长从订阅开始计算
+            self._last_lcm_msg_ts = time.monotonic()
+            self._lcm_stale = False
+
             # 启动LCM健康检查定时器
             self.lcm_health_timer = QTimer()
             self.lcm_health_timer.timeout.connect(self._lcm_health_check)
@@ -4413,61 +4614,133 @@ class BallTrajectorySimulator:
     #         # 如果错误持续发生，可能需要重建LCM实例
 
     def _handle_lcm_message(self, channel, data):
-        """处理来自 LCM 的实时消息"""
-        # 基础状态过滤
-        if not hasattr(self, 'data_source') or self.data_source != "real_time":
+        """处理来自 LCM 的实时消息（运行于LCM工作线程，只做解码和算法处理）"""
+        # 记录消息到达时间，供健康检查判断连接是否活跃：必须在任何过滤之前，
+        # 非实时模式（如本地监视）下消息同样说明连接正常
+        self._last_lcm_msg_ts = time.monotonic()
+
+        # 基础状态过滤（data_source在__init__中已初始化）
+        if self.data_source != "real_time":
             return
 
         try:
             # 1. 解码消息
-            msg = exlcm.ball_position_t.decode(data)
+            msg = self._decode_ball_position(data)
+            if msg is None:
+                return
             current_ts = time.time()
 
-            # [乒乓球评估]调用处理器
-            res = self.processor.process_realtime_step([msg.x, msg.y, msg.z], current_ts)
-            filtered_pos, speed, events = res
-            
-            if filtered_pos is not None:
-                # --- 新增：评估模式抓取数据 ---
-                if self.is_evaluating_serve:
-                    self.serve_data.append({'pos': filtered_pos, 'time': current_ts})
-                    
-                    # 如果检测到落点，自动停止并分析
-                    if events.get("landing_detected"):
-                        # 延迟一点点停止，为了抓取到撞击瞬间的完整轨迹
-                        QTimer.singleShot(300, self.stop_serve_evaluation)
-            # ---------------------------
-            
-            # 2. 调用处理器（执行滤波、去噪、落点分析等核心算法）
-            res = self.processor.process_realtime_step([msg.x, msg.y, msg.z], current_ts)
-            filtered_pos, speed, events = res
+            # 2. 调用处理器（执行滤波、去噪、落点分析等核心算法），每条消息只处理一次；
+            #    处理器只读取三个分量，直接传元组即可，无需构造数组
+            filtered_pos, speed, events = self.processor.process_realtime_step(
+                (msg.x, msg.y, msg.z), current_ts
+            )
             
             # 如果是噪点被处理器拦截，则不进行渲染
             if filtered_pos is None: 
                 return
 
-            # 3. 更新 3D 渲染 (addNewBall 很快，但 updatePlot 很耗资源，因此控制刷新率)
-            self.plt.addNewBall(filtered_pos)
-            if events.get("frame_count", 0) % 2 == 0: # 隔帧刷新 OpenGL 提高流畅度
-                self.plt.updatePlot()
+            # [乒乓球评估]评估模式抓取数据
+            if self.is_evaluating_serve:
+                self.serve_data.append({'pos': filtered_pos, 'time': current_ts})
 
-            # 4. 更新 UI 文本显示
-            self.update_speed_display(speed, events["shot_count"])
+            # 3. 缓存新位置，3D 重绘由渲染定时器按固定帧率完成
+            with self._latest_positions_lock:
+                self._latest_positions.append(filtered_pos)
+                self.trajectory_points.append(
+                    (current_ts, filtered_pos[0], filtered_pos[1], filtered_pos[2])
+                )
+            self._plot_dirty = True
 
-            # 5. 处理重大事件记录
-            if events["y_trend_changed"]:
+            # 4. 处理重大事件记录
+            if events.y_trend_changed:
                 # 记录速度数据
                 self.processor.recorder.record_speed_data(current_ts, speed, filtered_pos, self.processor.prev_pos)
-                self.update_speed_chart()
-            
-            if events["landing_detected"]:
-                # 更新落点图表
-                self.update_heatmap_display()
-                self.update_scatter_display()
+
+            # 5. 界面刷新投递到GUI线程，工作线程继续解码下一条消息
+            self.main_widget.new_frame.emit(filtered_pos, float(speed), events)
 
         except Exception as e:
-            # 这里打印错误，方便你在优化算法时调试
-            print(f"📡 LCM Process Error: {e}")
+            # 每条消息都可能触发，使用延迟格式化的DEBUG日志，方便在优化算法时调试
+            logger.debug("LCM Process Error: %s", e)
+
+    def _decode_ball_position(self, data):
+        """解码球位置消息；标准解码失败且长度恰好等于 ball_position_t 时跳过fingerprint兼容解码"""
+        try:
+            return exlcm.ball_position_t.decode(data)
+        except Exception as decode_error:
+            # 仅接受长度完全一致的消息（fingerprint版本不同但布局相同），其他消息仍按解码失败处理
+            if len(data) == 8 + _BALL_POS_STRUCT.size:
+                self._compat_decode_count += 1
+                if self._compat_decode_count == 1:
+                    fingerprint = int.from_bytes(data[:8], 'big')
+                    logger.warning(
+                        "ball_position_t fingerprint不匹配(收到 0x%016x)，按兼容结构解码: %s",
+                        fingerprint, decode_error,
+                    )
+                # 直接从原缓冲区偏移8字节处解析，不切片复制
+                msg = exlcm.ball_position_t()
+                msg.timestamp, msg.x, msg.y, msg.z = _BALL_POS_STRUCT.unpack_from(data, 8)
+                return msg
+
+            # 逐条诊断信息走DEBUG级别，参数惰性格式化；fingerprint仅在DEBUG开启时提取
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "LCM消息解码失败: %s，数据长度 %d，收到fingerprint 0x%016x，期望 0x%016x",
+                    decode_error, len(data), int.from_bytes(data[:8], 'big'),
+                    _BALL_POS_FINGERPRINT,
+                )
+
+            # 同一发送方持续发送异常消息时不按消息频率刷日志：首次记录，之后定期汇总
+            self._decode_fail_count += 1
+            if self._decode_fail_count == 1:
+                logger.error("LCM消息解码失败: %s", decode_error)
+            elif not self._decode_fail_count % LCM_DECODE_ERROR_LOG_EVERY:
+                logger.error(
+                    "LCM消息解码失败累计 %d 次，最近一次: %s",
+                    self._decode_fail_count, decode_error,
+                )
+            return None
+
+    def _on_new_frame(self, filtered_pos, speed, events):
+        """在GUI线程中刷新实时帧相关的界面（由new_frame信号投递）"""
+        try:
+            # 发球评估：检测到落点后延迟一点点停止，为了抓取到撞击瞬间的完整轨迹
+            if self.is_evaluating_serve and events.landing_detected:
+                QTimer.singleShot(300, self.stop_serve_evaluation)
+
+            # 1. 更新 UI 文本显示
+            self.update_speed_display(speed, events.shot_count)
+
+            # 2. 标记需要更新的图表（由图表定时器以最多10Hz统一重绘）
+            if events.y_trend_changed:
+                self.speed_data.append((events.shot_count, speed))
+                self._mark_charts_dirty(speed=True)
+
+            if events.landing_detected:
+                self._mark_charts_dirty(landing=True)
+
+        except Exception as e:
+            logger.debug("LCM Render Error: %s", e)
+
+    def _render_tick(self):
+        """渲染定时器回调：把缓存的新位置一次性加入3D视图，每个周期只重绘一次"""
+        if not self._plot_dirty:
+            return
+        # 先清标志再取数据：取数据之后到达的新位置会重新置位，留给下一个周期
+        self._plot_dirty = False
+        with self._latest_positions_lock:
+            if not self._latest_positions:
+                return
+            positions = list(self._latest_positions)
+            self._latest_positions.clear()
+
+        try:
+            for pos in positions:
+                self.plt.addNewBall(pos)
+            self.plt.updatePlot()
+        except Exception as e:
+            logger.debug("3D视图更新失败: %s", e)
 
 
     def _lcm_worker(self):
@@ -4475,66 +4748,64 @@ class BallTrajectorySimulator:
         consecutive_errors = 0  # 连续错误计数
         max_consecutive_errors = 5  # 最大连续错误次数
         reconnect_delay = 1.0  # 重连延迟（秒）
+        lcm_lock = self.lcm_lock  # 锁对象生命周期内不变，提到循环外
         
         try:
             print("🔄 LCM工作线程已启动")
             
-            while self.lcm_running:
+            while self.lcm_state is not LcmState.STOPPED:
                 try:
-                    # 检查LCM实例是否有效
-                    if not self.lcm_instance:
-                        print("⚠️ LCM实例无效，尝试重新创建...")
+                    # 每轮只读取一次实例引用（实例可能被健康检查重建，不能提到循环外）
+                    lcm_instance = self.lcm_instance
+                    lcm_sel = self._lcm_sel
+                    if not lcm_instance or lcm_sel is None:
+                        logger.warning("LCM实例无效，尝试重新创建...")
                         self._recreate_lcm_instance()
                         continue
                     
-                    # 使用线程锁保护LCM操作
-                    with self.lcm_lock:
-                        if self.lcm_operation_in_progress:
-                            # 如果其他操作正在进行，等待一下
-                            time.sleep(0.01)
+                    # 阻塞等待套接字可读，替代轮询+休眠，消息到达即处理
+                    if not lcm_sel.select(timeout=0.5):
+                        continue
+                    
+                    # 使用线程锁保护LCM操作；停止或重建期间实例已不是当前实例，跳过本轮
+                    with lcm_lock:
+                        if (
+                            self.lcm_state is not LcmState.RUNNING
+                            or lcm_instance is not self.lcm_instance
+                        ):
                             continue
-                            
-                        self.lcm_operation_in_progress = True
-                        
-                        try:
-                            # 处理LCM消息（非阻塞，超时100ms）
-                            message_count = self.lcm_instance.handle_timeout(100)
-                            
-                            if message_count > 0:
-                                # 有消息被处理，重置错误计数
-                                consecutive_errors = 0
-                                if consecutive_errors > 0:
-                                    print(f"✅ LCM消息处理恢复正常，连续错误计数重置")
-                            elif message_count < 0:
-                                # 处理错误
-                                consecutive_errors += 1
-                                print(f"⚠️ LCM处理返回错误: {message_count}, 连续错误: {consecutive_errors}")
-                                
-                                if consecutive_errors >= max_consecutive_errors:
-                                    print(f"❌ 连续错误过多，尝试重新创建LCM实例")
-                                    self._recreate_lcm_instance()
-                                    consecutive_errors = 0
-                                    time.sleep(reconnect_delay)
-                        finally:
-                            self.lcm_operation_in_progress = False
+                        # 套接字已可读，立即处理消息（超时0，不会阻塞）
+                        message_count = lcm_instance.handle_timeout(0)
                     
-                    # 短暂休眠，避免CPU占用过高
-                    time.sleep(0.01)
+                    if message_count > 0:
+                        # 有消息被处理，重置错误计数
+                        consecutive_errors = 0
+                    elif message_count < 0:
+                        # 处理错误
+                        consecutive_errors += 1
+                        logger.debug(
+                            "LCM处理返回错误: %d, 连续错误: %d",
+                            message_count,
+                            consecutive_errors,
+                        )
+                        
+                        if consecutive_errors >= max_consecutive_errors:
+                            logger.warning("连续错误过多，尝试重新创建LCM实例")
+                            self._recreate_lcm_instance()
+                            consecutive_errors = 0
+                            time.sleep(reconnect_delay)
                     
                 except Exception as e:
                     consecutive_errors += 1
-                    error_msg = f"LCM工作线程循环异常: {str(e)}"
-                    print(f"❌ {error_msg}")
-                    logger.error(error_msg)
+                    logger.error("LCM工作线程循环异常: %s", e)
                     
                     if consecutive_errors >= max_consecutive_errors:
-                        print(f"❌ 连续异常过多，尝试重新创建LCM实例")
+                        logger.warning("连续异常过多，尝试重新创建LCM实例")
                         try:
                             self._recreate_lcm_instance()
                             consecutive_errors = 0
                         except Exception as reconnect_error:
-                            print(f"❌ 重新创建LCM实例失败: {reconnect_error}")
-                            logger.error(f"重新创建LCM实例失败: {str(reconnect_error)}")
+                            logger.error("重新创建LCM实例失败: %s", reconnect_error)
                         
                         time.sleep(reconnect_delay)
                     else:
@@ -4555,8 +4826,8 @@ class BallTrajectorySimulator:
                 
         finally:
             print("🔄 LCM工作线程已结束")
-            # 如果线程意外退出但lcm_running仍为True，尝试重启
-            if self.lcm_running:
+            # 如果线程意外退出但订阅仍处于运行状态，尝试重启
+            if self.lcm_state is LcmState.RUNNING:
                 print("⚠️ LCM工作线程意外退出，尝试重启...")
                 QTimer.singleShot(2000, self._restart_lcm_worker)  # 2秒后尝试重启
 
@@ -4565,6 +4836,12 @@ class BallTrajectorySimulator:
     def stop_lcm_subscription(self):
         """停止LCM订阅"""
         try:
+            # 先切换状态：工作线程在下一轮循环退出，重复调用为空操作
+            with self.lcm_lock:
+                if self.lcm_state is LcmState.STOPPED:
+                    return
+                self.lcm_state = LcmState.STOPPED
+
             print("🔄 正在停止LCM订阅...")
             
             # 停止健康检查定时器
@@ -4573,44 +4850,43 @@ class BallTrajectorySimulator:
                 self.lcm_health_timer = None
                 print("✅ LCM健康检查定时器已停止")
 
-            # 等待一小段时间确保定时器完全停止
-            time.sleep(0.1)
-
-            # 停止工作线程
-            self.lcm_running = False
+            # 停止实时渲染定时器（QTimer.stop在GUI线程同步生效，无需等待）
+            self._render_timer.stop()
 
+            # 等待工作线程结束（select超时0.5秒，1秒内必然检查到停止状态）
             if self.lcm_thread and self.lcm_thread.is_alive():
                 print("🔄 等待LCM工作线程结束...")
-                self.lcm_thread.join(timeout=2.0)
+                self.lcm_thread.join(timeout=1.0)
                 if self.lcm_thread.is_alive():
-                    print("⚠️ LCM工作线程未能在2秒内结束")
+                    print("⚠️ LCM工作线程未能在1秒内结束")
 
-            # 等待线程锁释放
-            if hasattr(self, 'lcm_lock'):
-                with self.lcm_lock:
-                    pass  # 确保锁被释放
-
-            # 清理订阅和实例
-            if self.lcm_subscription and self.lcm_instance:
-                try:
-                    self.lcm_instance.unsubscribe(self.lcm_subscription)
-                    print("✅ LCM订阅已取消")
-                except Exception as e:
-                    print(f"⚠️ 取消LCM订阅失败: {e}")
-                self.lcm_subscription = None
+            # 线程结束后再在锁内取消订阅：即使线程超时未退出，handle_timeout也在同一把锁内，
+            # 且工作线程会先检查状态，不会在订阅释放后继续分发消息
+            with self.lcm_lock:
+                if self.lcm_subscription and self.lcm_instance:
+                    try:
+                        self.lcm_instance.unsubscribe(self.lcm_subscription)
+                        print("✅ LCM订阅已取消")
+                    except Exception as e:
+                        print(f"⚠️ 取消LCM订阅失败: {e}")
+                    self.lcm_subscription = None
 
-            if self.lcm_instance:
-                try:
-                    # LCM对象没有close方法，只需要取消订阅即可
-                    print("✅ LCM实例已清理")
-                except Exception as e:
-                    print(f"⚠️ 清理LCM实例失败: {e}")
+                # LCM对象没有close方法，取消订阅后交给垃圾回收即可
                 self.lcm_instance = None
 
+                # 关闭套接字选择器
+                if self._lcm_sel is not None:
+                    self._lcm_sel.close()
+                    self._lcm_sel = None
+
+            # 丢弃尚未绘制的实时坐标，避免上一次订阅的点出现在下一次的3D视图中
+            with self._latest_positions_lock:
+                self._latest_positions.clear()
+                self._plot_dirty = False
+
             # 重置相关状态
             self.lcm_thread = None
-            self._lcm_health_error_count = 0 if hasattr(self, '_lcm_health_error_count') else 0
-            self.lcm_operation_in_progress = False
+            self._lcm_stale = False
 
             print("✅ LCM订阅已完全停止")
             logger.info("LCM订阅已完全停止")
@@ -4636,12 +4912,11 @@ class BallTrajectorySimulator:
                 try:
                     # 安全地清空3D视图数据
                     if hasattr(self.plt, 'pos_list_memory_lenth'):
-                        self.plt.pos_list = [
-                            np.full([3], None) for _ in range(self.plt.pos_list_memory_lenth)
-                        ]
-                        self.plt.n = 0
-                        self.plt.updatePlot()
-                        print("✅ 3D视图轨迹已清空")
+                        # 视图中已经没有点时无需清空和重绘
+                        if getattr(self.plt, 'n', 0) > 0:
+                            self._clear_plot_buffer()
+                            self.plt.updatePlot()
+                            print("✅ 3D视图轨迹已清空")
                     else:
                         print("⚠️ 3D视图缺少pos_list_memory_lenth属性")
                 except Exception as e:
@@ -4670,7 +4945,9 @@ class BallTrajectorySimulator:
                 self.update_speed_display(0.0, shot_count)
                 self.update_speed_chart()
 
-            self.processor.reset() # 确保处理器也清空了历史滤波状态
+            # 确保处理器也清空了历史滤波状态（只重置一次）
+            self.processor.reset()
+
             # 更新数据源标识
             self.data_source = "real_time"
             
@@ -4698,18 +4975,15 @@ class BallTrajectorySimulator:
                 self.realtime_render_btn.setText("Real-time Render")
                 print("🔄 实时渲染按钮状态已重置")
 
-            # 清空实时数据列表
-            self.real_time_positions = []
-            self.real_time_timestamps = []
-            if hasattr(self, "real_time_pos_list"):
-                self.real_time_pos_list = []
+            # 清空实时数据缓冲
+            self.real_time_positions.clear()
+            self.real_time_timestamps.clear()
+            with self._latest_positions_lock:
+                self.trajectory_points.clear()
 
-            # 清空3D视图中的实时轨迹
-            if hasattr(self, "plt") and self.plt:
-                self.plt.pos_list = [
-                    np.full([3], None) for _ in range(self.plt.pos_list_memory_lenth)
-                ]
-                self.plt.n = 0
+            # 清空3D视图中的实时轨迹（视图中已经没有点时跳过）
+            if hasattr(self, "plt") and self.plt and getattr(self.plt, 'n', 0) > 0:
+                self._clear_plot_buffer()
                 self.plt.updatePlot()
 
             # 更新数据源标识
@@ -4737,10 +5011,7 @@ class BallTrajectorySimulator:
 
             # 清理3D视图
             if hasattr(self, "plt") and self.plt:
-                self.plt.pos_list = [
-                    np.full([3], None) for _ in range(self.plt.pos_list_memory_lenth)
-                ]
-                self.plt.n = 0
+                self._clear_plot_buffer()
                 self.plt.updatePlot()
                 print("🧹 3D视图已清理")
 
@@ -4754,16 +5025,16 @@ class BallTrajectorySimulator:
         """获取实时模式的当前状态信息"""
         try:
             status = {
-                "data_source": getattr(self, 'data_source', 'unknown'),
-                "lcm_running": getattr(self, 'lcm_running', False),
-                "frame_count": getattr(self, 'frame_count', 0),
-                "current_time": getattr(self, 'current_time', 0),
-                "realtime_trajectory_index": getattr(self, '_realtime_trajectory_index', 0),
-                "prev_realtime_pos": getattr(self, 'prev_realtime_pos', None),
-                "prev_realtime_time": getattr(self, 'prev_realtime_time', None),
-                "prev_realtime_y_trend": getattr(self, 'prev_realtime_y_trend', None),
-                "shot_count": self.trajectory_recorder.get_shot_count() if hasattr(self, 'trajectory_recorder') else 0,
-                "rally_count": self.trajectory_recorder.get_rally_count() if hasattr(self, 'trajectory_recorder') else 0
+                "data_source": self.data_source,
+                "lcm_running": self.lcm_running,
+                "frame_count": self.frame_count,
+                "current_time": self.current_time,
+                "realtime_trajectory_index": self._realtime_trajectory_index,
+                "prev_realtime_pos": self.prev_realtime_pos,
+                "prev_realtime_time": self.prev_realtime_time,
+                "prev_realtime_y_trend": self.prev_realtime_y_trend,
+                "shot_count": self.trajectory_recorder.get_shot_count(),
+                "rally_count": self.trajectory_recorder.get_rally_count()
             }
             return status
         except Exception as e:
@@ -4786,35 +5057,38 @@ class BallTrajectorySimulator:
 
 
     def _recreate_lcm_instance(self):
-        """重新创建LCM实例和订阅"""
+        """重新创建LCM实例和订阅（仅在运行状态下有效，否则为空操作）"""
         try:
-            print("🔄 重新创建LCM实例...")
-            
-            # 清理旧的实例
-            if self.lcm_subscription and self.lcm_instance:
-                try:
-                    self.lcm_instance.unsubscribe(self.lcm_subscription)
-                    print("✅ 旧订阅已取消")
-                except Exception as e:
-                    print(f"⚠️ 取消旧订阅失败: {e}")
-                self.lcm_subscription = None
-            
-            if self.lcm_instance:
+            with self.lcm_lock:
+                if self.lcm_state is not LcmState.RUNNING:
+                    return
+                self.lcm_state = LcmState.RESTARTING
+                print("🔄 重新创建LCM实例...")
+
                 try:
-                    # LCM对象没有close方法，只需要取消订阅即可
-                    # 让Python垃圾回收器处理LCM实例
-                    print("✅ 旧LCM实例已清理")
-                except Exception as e:
-                    print(f"⚠️ 清理旧LCM实例失败: {e}")
-                self.lcm_instance = None
-            
-            # 创建新的LCM实例
-            self.lcm_instance = lcm.LCM()
-            
-            # 重新订阅
-            self.lcm_subscription = self.lcm_instance.subscribe(
-                "EXAMPLE", self._handle_lcm_message
-            )
+                    # 清理旧的实例
+                    if self.lcm_subscription and self.lcm_instance:
+                        try:
+                            self.lcm_instance.unsubscribe(self.lcm_subscription)
+                            print("✅ 旧订阅已取消")
+                        except Exception as e:
+                            print(f"⚠️ 取消旧订阅失败: {e}")
+                        self.lcm_subscription = None
+
+                    # LCM对象没有close方法，取消订阅后交给垃圾回收即可
+                    self.lcm_instance = None
+
+                    # 创建新的LCM实例
+                    self.lcm_instance = lcm.LCM()
+                    self._register_lcm_selector()
+
+                    # 重新订阅
+                    self.lcm_subscription = self.lcm_instance.subscribe(
+                        "EXAMPLE", self._handle_lcm_message
+                    )
+                finally:
+                    # 重建失败也回到运行状态，由工作线程下一轮继续尝试
+                    self.lcm_state = LcmState.RUNNING
             
             print("✅ LCM实例重建成功")
             logger.info("LCM实例重建成功")
@@ -4825,10 +5099,19 @@ class BallTrajectorySimulator:
             logger.error(error_msg)
             raise
 
+    def _register_lcm_selector(self):
+        """将当前LCM实例的套接字注册到选择器（实例重建后需重新注册）"""
+        if self._lcm_sel is None:
+            self._lcm_sel = selectors.DefaultSelector()
+        else:
+            for key in list(self._lcm_sel.get_map().values()):
+                self._lcm_sel.unregister(key.fileobj)
+        self._lcm_sel.register(self.lcm_instance.fileno(), selectors.EVENT_READ)
+
     def _restart_lcm_worker(self):
         """重启LCM工作线程"""
         try:
-            if not self.lcm_running:
+            if self.lcm_state is not LcmState.RUNNING:
                 print("⚠️ LCM已停止运行，不重启工作线程")
                 return
                 
@@ -4857,24 +5140,18 @@ class BallTrajectorySimulator:
                 return False
                 
             if not self.lcm_thread or not self.lcm_thread.is_alive():
-                print("⚠️ LCM工作线程已死亡")
+                logger.debug("LCM工作线程已死亡")
                 return False
                 
             if not self.lcm_instance:
-                print("⚠️ LCM实例无效")
+                logger.debug("LCM实例无效")
                 return False
                 
-            # 尝试简单的LCM操作来测试连接
-            try:
-                # 非阻塞检查，超时10ms
-                self.lcm_instance.handle_timeout(10)
-                return True
-            except Exception as e:
-                print(f"⚠️ LCM健康检查失败: {e}")
-                return False
+            # 只看最近是否收到过消息，不在UI线程中操作LCM套接字
+            return time.monotonic() - self._last_lcm_msg_ts <= LCM_SILENCE_THRESHOLD
                 
         except Exception as e:
-            print(f"❌ LCM健康检查异常: {e}")
+            logger.debug("LCM健康检查异常: %s", e)
             return False
 
     def _lcm_health_check(self):
@@ -4885,109 +5162,115 @@ class BallTrajectorySimulator:
                 
             # 检查工作线程状态
             if not self.lcm_thread or not self.lcm_thread.is_alive():
-                print("⚠️ LCM健康检查: 工作线程已死亡，尝试重启...")
+                logger.warning("LCM健康检查: 工作线程已死亡，尝试重启...")
                 self._restart_lcm_worker()
                 return
                 
             # 检查LCM实例状态
             if not self.lcm_instance:
-                print("⚠️ LCM健康检查: 实例无效，尝试重建...")
+                logger.warning("LCM健康检查: 实例无效，尝试重建...")
                 self._recreate_lcm_instance()
                 return
                 
-            # 使用线程锁保护LCM操作，避免并发调用
-            with self.lcm_lock:
-                if self.lcm_operation_in_progress:
-                    # 如果工作线程正在操作，跳过这次检查
-                    return
-                    
-                # 检查消息处理状态（通过简单的超时操作）
-                try:
-                    # 非阻塞检查，超时10ms
-                    result = self.lcm_instance.handle_timeout(10)
-                    if result < 0:
-                        print(f"⚠️ LCM健康检查: 处理返回错误 {result}")
-                    # 即使有错误也不立即重建，给系统一些恢复时间
-                        
-                except Exception as e:
-                    print(f"⚠️ LCM健康检查: 实例操作异常 {e}")
-                    # 如果连续出现异常，考虑重建实例
-                    if not hasattr(self, '_lcm_health_error_count'):
-                        self._lcm_health_error_count = 0
-                    self._lcm_health_error_count += 1
-                    
-                    if self._lcm_health_error_count >= 3:
-                        print("❌ LCM健康检查: 连续错误过多，重建实例...")
-                        self._recreate_lcm_instance()
-                        self._lcm_health_error_count = 0
+            # 检查消息到达情况：消息只由工作线程处理，这里不调用handle_timeout，无需加锁
+            silence = time.monotonic() - self._last_lcm_msg_ts
+            stale = silence > LCM_SILENCE_THRESHOLD
+            if stale and not self._lcm_stale:
+                logger.warning("LCM健康检查: 已 %.0f 秒未收到消息，重建LCM实例", silence)
+                # 每次静默只重建一次（套接字可能因网络变化失去组播成员关系），
+                # 之后保持观察，发送方空闲时不反复重建
+                self._recreate_lcm_instance()
+            elif not stale and self._lcm_stale:
+                logger.info("LCM健康检查: 消息接收已恢复")
+            self._lcm_stale = stale
                         
         except Exception as e:
-            print(f"❌ LCM健康检查异常: {e}")
-            logger.error(f"LCM健康检查异常: {str(e)}")
+            logger.error("LCM健康检查异常: %s", e)
 
     def safe_shutdown(self):
         """安全的程序关闭，确保资源按正确顺序清理"""
         try:
             print("🔄 开始安全关闭程序...")
-            
-            # 1. 首先停止所有定时器
-            if hasattr(self, 'training_timer') and self.training_timer:
-                self.training_timer.stop()
-                print("✅ 训练定时器已停止")
-                
-            if hasattr(self, 'lcm_health_timer') and self.lcm_health_timer:
-                self.lcm_health_timer.stop()
-                print("✅ LCM健康检查定时器已停止")
-            
-            # 2. 保存当前训练时长到存档
-            try:
-                total_seconds = self.calculate_training_time()
-                self.save_training_time_to_archive(total_seconds)
-                print(f"💾 最终训练时长已保存: {total_seconds:.0f}秒")
-            except Exception as e:
-                print(f"⚠️ 保存最终训练时长失败: {e}")
-            
-            # 3. 停止LCM订阅
-            if hasattr(self, 'lcm_running') and self.lcm_running:
-                self.stop_lcm_subscription()
-            
-            # 4. 关闭采集程序进程 - 使用简洁的endprocess方式
-            self._force_kill_collection_process()
-            
-            # 5. 等待一小段时间确保所有线程完全停止
-            time.sleep(0.2)
-            
-            # 6. 关闭数据记录
-            if hasattr(self, 'trajectory_recorder'):
-                try:
-                    self.trajectory_recorder.close_speed_data_recording()
-                    print("✅ 速度数据记录已关闭")
-                except Exception as e:
-                    print(f"⚠️ 关闭速度数据记录失败: {e}")
-                    
-            if hasattr(self, 'landing_analyzer'):
-                try:
-                    self.landing_analyzer.close_landing_data_recording()
-                    print("✅ 落点数据记录已关闭")
-                except Exception as e:
-                    print(f"⚠️ 关闭落点数据记录失败: {e}")
-            
-            # 6. 最后关闭3D视图（OpenGL上下文）
-            if hasattr(self, 'plt') and self.plt:
-                try:
-                    # 清空3D视图数据，避免OpenGL错误
-                    self.plt.pos_list = []
-                    self.plt.n = 0
-                    print("✅ 3D视图数据已清空")
-                except Exception as e:
-                    print(f"⚠️ 清空3D视图失败: {e}")
-            
+
+            steps = [
+                # 1. 首先停止所有定时器
+                self._stop_shutdown_timers,
+                # 2. 保存当前训练时长到存档
+                self._save_final_training_time,
+                # 3. 停止LCM订阅
+                self._stop_lcm_on_shutdown,
+                # 4. 关闭采集程序进程 - 使用简洁的endprocess方式
+                self._force_kill_collection_process,
+                # 5. 等待LCM线程退出（线程已结束时立即返回）
+                lambda: self.lcm_thread.join(0.5) if self.lcm_thread else None,
+                # 6. 关闭数据记录
+                self._close_data_recording,
+                # 7. 最后关闭3D视图（OpenGL上下文）
+                self._clear_3d_view_on_shutdown,
+            ]
+            # ExitStack按后进先出执行回调，逆序注册即按上面的顺序执行；
+            # 某一步抛出异常不会跳过其余步骤
+            with ExitStack() as stack:
+                for step in reversed(steps):
+                    stack.callback(step)
+
             print("✅ 程序安全关闭完成")
             
         except Exception as e:
             print(f"❌ 程序安全关闭失败: {e}")
             logger.error(f"程序安全关闭失败: {str(e)}")
 
+    def _stop_shutdown_timers(self):
+        """关闭时停止训练计时和LCM健康检查定时器"""
+        if hasattr(self, 'training_timer') and self.training_timer:
+            self.training_timer.stop()
+            print("✅ 训练定时器已停止")
+            
+        if hasattr(self, 'lcm_health_timer') and self.lcm_health_timer:
+            self.lcm_health_timer.stop()
+            print("✅ LCM健康检查定时器已停止")
+
+    def _save_final_training_time(self):
+        """关闭时保存最终训练时长到存档"""
+        try:
+            total_seconds = self.calculate_training_time()
+            self.save_training_time_to_archive(total_seconds)
+            print(f"💾 最终训练时长已保存: {total_seconds:.0f}秒")
+        except Exception as e:
+            print(f"⚠️ 保存最终训练时长失败: {e}")
+
+    def _stop_lcm_on_shutdown(self):
+        """关闭时停止LCM订阅"""
+        if self.lcm_running:
+            self.stop_lcm_subscription()
+
+    def _close_data_recording(self):
+        """关闭速度和落点数据记录"""
+        if hasattr(self, 'trajectory_recorder'):
+            try:
+                self.trajectory_recorder.close_speed_data_recording()
+                print("✅ 速度数据记录已关闭")
+            except Exception as e:
+                print(f"⚠️ 关闭速度数据记录失败: {e}")
+                
+        if hasattr(self, 'landing_analyzer'):
+            try:
+                self.landing_analyzer.close_landing_data_recording()
+                print("✅ 落点数据记录已关闭")
+            except Exception as e:
+                print(f"⚠️ 关闭落点数据记录失败: {e}")
+
+    def _clear_3d_view_on_shutdown(self):
+        """关闭时清空3D视图数据，避免OpenGL错误"""
+        if hasattr(self, 'plt') and self.plt:
+            try:
+                # 视图即将销毁，直接置空，无需像运行时清空那样重建占位行
+                self.plt.pos_list = []
+                self.plt.n = 0
+                print("✅ 3D视图数据已清空")
+            except Exception as e:
+                print(f"⚠️ 清空3D视图失败: {e}")
+
     def handle_close_event(self, event):
         """处理窗口关闭事件"""
         try:
@@ -5017,14 +5300,11 @@ class BallTrajectorySimulator:
             if not self.save_folder_path:
                 return
                 
-            training_file = os.path.join(self.save_folder_path, "training_time.txt")
-            
             # 确保目录存在
-            os.makedirs(os.path.dirname(training_file), exist_ok=True)
+            self._p_training_time.parent.mkdir(parents=True, exist_ok=True)
             
             # 保存训练时长（秒）
-            with open(training_file, "w", encoding="utf-8") as f:
-                f.write(str(int(total_seconds)))
+            self._write_training_time(total_seconds)
             
             print(f"💾 训练时长已保存到存档: {total_seconds:.0f}秒")
             
@@ -5032,11 +5312,27 @@ class BallTrajectorySimulator:
             print(f"❌ 保存训练时长失败: {e}")
             logger.error(f"保存训练时长失败: {str(e)}")
 
+    def _write_training_time(self, total_seconds):
+        """以8字节二进制写入训练时长：先写临时文件再os.replace，崩溃时不会留下半截存档"""
+        tmp_file = self._p_training_time.with_name(self._p_training_time.name + ".tmp")
+        with open(tmp_file, "wb") as f:
+            f.write(_TRAINING_TIME_STRUCT.pack(max(0, int(total_seconds))))
+        os.replace(tmp_file, self._p_training_time)
+
     def validate_and_reset_training_time(self):
         """验证并重置异常的训练时长值"""
+        return self._validate_training_time(self.calculate_training_time())
+
+    def _validate_training_time(self, current_total):
+        """验证已计算好的训练时长，异常时重置并返回True"""
         try:
-            current_total = self.calculate_training_time()
-            
+            # 检查是否为NaN或Inf（标量用math判断，避免numpy ufunc开销）
+            if math.isnan(current_total) or math.isinf(current_total):
+                print(f"⚠️ 训练时长无效: {current_total}，重置为0")
+                self.total_training_time = 0
+                self.training_start_time = time.time()
+                return True
+
             # 检查训练时长是否异常（超过24小时）
             if current_total > 86400:  # 24小时 = 86400秒
                 print(f"⚠️ 训练时长异常: {current_total:.0f}秒 (>24小时)，重置为0")
@@ -5051,13 +5347,6 @@ class BallTrajectorySimulator:
                 self.training_start_time = time.time()
                 return True
                 
-            # 检查是否为NaN或Inf
-            if np.isnan(current_total) or np.isinf(current_total):
-                print(f"⚠️ 训练时长无效: {current_total}，重置为0")
-                self.total_training_time = 0
-                self.training_start_time = time.time()
-                return True
-                
             return False
             
         except Exception as e:
@@ -5072,14 +5361,16 @@ class BallTrajectorySimulator:
         try:
             total_seconds = self.calculate_training_time()
             
-            # 验证时长值
-            if self.validate_and_reset_training_time():
-                total_seconds = 0
+            # 验证时长值（复用已计算的总时长，每秒最多验证一次）
+            now = time.monotonic()
+            if now - self._last_validate_ts > 1.0:
+                self._last_validate_ts = now
+                if self._validate_training_time(total_seconds):
+                    total_seconds = 0
             
             # 转换为时:分:秒格式
-            hours = int(total_seconds // 3600)
-            minutes = int((total_seconds % 3600) // 60)
-            seconds = int(total_seconds % 60)
+            hours, rem = divmod(int(total_seconds), 3600)
+            minutes, seconds = divmod(rem, 60)
             
             return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
             
@@ -5184,10 +5475,28 @@ class BallTrajectorySimulator:
         # 分析完后立即更新热力图（查看历史分布）
         self.update_heatmap_display()
 
+def _setup_queue_logging():
+    """把logger现有的处理器移到后台QueueListener线程，UI/LCM线程写日志只需入队"""
+    if any(isinstance(h, QueueHandler) for h in logger.handlers):
+        return None
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
 def main():
     """主函数."""
     try:
-        app = QtWidgets.QApplication([])
+        _setup_queue_logging()
+
+        # 复用已存在的QApplication（例如被主界面导入调用时），避免重复创建
+        app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
 
         # 在创建主窗口之前设置应用程序图标
         try:
@@ -5195,38 +5504,13 @@ def main():
                 os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logo.jpg"
             )
             if os.path.exists(icon_path):
-                try:
-                    import cv2
-                    from PyQt5.QtGui import QIcon, QImage, QPixmap
-
-                    # 使用OpenCV读取图片并转换为QPixmap
-                    img = cv2.imread(icon_path)
-                    if img is not None:
-                        # 转换BGR到RGB
-                        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                        height, width, channel = img_rgb.shape
-                        bytes_per_line = 3 * width
-
-                        # 创建QPixmap
-                        qimg = QImage(
-                            img_rgb.data,
-                            width,
-                            height,
-                            bytes_per_line,
-                            QImage.Format_RGB888,
-                        )
-                        pixmap = QPixmap.fromImage(qimg)
-
-                        # 创建图标并设置到应用程序
-                        icon = QIcon(pixmap)
-                        app.setWindowIcon(icon)
-                        print(f"✅ 应用程序图标已设置: {icon_path}")
-                    else:
-                        print(f"⚠️ 无法读取图片文件: {icon_path}")
-                except ImportError:
-                    print(f"⚠️ cv2模块未安装，跳过图标设置")
-                except Exception as e:
-                    print(f"⚠️ 设置应用程序图标失败: {e}")
+                # 直接用Qt内置的JPEG插件解码，无需导入OpenCV
+                icon = QIcon(icon_path)
+                if not icon.isNull():
+                    app.setWindowIcon(icon)
+                    print(f"✅ 应用程序图标已设置: {icon_path}")
+                else:
+                    print(f"⚠️ 无法读取图片文件: {icon_path}")
             else:
                 print(f"⚠️ 图标文件不存在: {icon_path}")
         except Exception as e:
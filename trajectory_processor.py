@@ -1,79 +1,127 @@
+from collections import namedtuple
+from dataclasses import dataclass
+
 import numpy as np
-import math
-import time
-from .interpolation import TrajectoryInterpolator
+
+from ._one_euro_core import filter_segments, step_core, warmup
 from .landing_analyzer import LandingAnalyzer
 from .trajectory_recorder import TrajectoryRecorder
 
-class LowPassFilter:
-    def __init__(self, alpha, init_value=None):
-        self.s = init_value
-        self.alpha = alpha
-        
-    def filter(self, value, alpha=None):
-        if alpha is not None: 
-            self.alpha = alpha
-        if self.s is None: 
-            self.s = value
-        else: 
-            self.s = self.alpha * value + (1.0 - self.alpha) * self.s
-        return self.s
+# 实时逐帧路径上用到的numpy函数预先绑定为模块级名称，省去每次 np.xxx 的属性查找；
+# filtered_pos 每帧必须是新数组（调用方会保存引用），因此用 np.array 而不是 np.asarray
+_array = np.array
+
+# 零向量字面量：速度等状态以元组保存，重置时直接复用，无需分配数组
+_ZERO3 = (0.0, 0.0, 0.0)
+
+
+@dataclass(frozen=True)
+class ProcessorConfig:
+    """TrajectoryProcessor 的算法参数（不同相机/场地只需传入不同配置）"""
+    min_cutoff: float = 1.5           # One-Euro 最小截止频率
+    beta: float = 0.15                # One-Euro 速度系数
+    d_cutoff: float = 1.5             # One-Euro 导数截止频率
+    max_jump_distance: float = 1500.0 # 噪点判定阈值(mm)，增大以容纳高速杀球
+    timeout_threshold: float = 0.5    # 断流判定阈值(秒)
+    default_dt: float = 0.033         # 新回合首帧使用的时间步长(秒)
+
+
+DEFAULT_CONFIG = ProcessorConfig()
+
+# process_realtime_step 返回的事件：按属性访问，比dict少一次哈希查找
+RealtimeEvents = namedtuple(
+    "RealtimeEvents",
+    "shot_count y_trend_changed landing_detected timeout",
+    defaults=(0, False, False, False),
+)
 
 class OneEuroFilter:
+    """One-Euro滤波的参数与状态，由 TrajectoryProcessor 通过 step_core 内核逐帧更新"""
+    __slots__ = ("min_cutoff", "beta", "d_cutoff", "s", "ds", "last_timestamp")
+
     def __init__(self, min_cutoff=1.5, beta=0.05, d_cutoff=1.0):
         self.min_cutoff = min_cutoff
         self.beta = beta
         self.d_cutoff = d_cutoff
-        self.x_filter = LowPassFilter(0)
-        self.dx_filter = LowPassFilter(0)
+        # 滤波状态保存为浮点数元组
+        self.s = _ZERO3   # 平滑后的位置
+        self.ds = _ZERO3  # 平滑后的导数
         self.last_timestamp = None
-        
-    def compute_alpha(self, cutoff, dt):
-        if dt <= 0: return 1.0
-        tau = 1.0 / (2 * math.pi * cutoff)
-        return 1.0 / (1.0 + tau / dt)
-        
-    def filter(self, x, timestamp):
-        if self.last_timestamp is None:
-            self.last_timestamp = timestamp
-            self.x_filter.s = x
-            self.dx_filter.s = np.zeros_like(x)
-            return x
-            
-        dt = timestamp - self.last_timestamp
-        if dt <= 0: return self.x_filter.s
-        
-        self.last_timestamp = timestamp
-        dx = (x - self.x_filter.s) / dt
-        edx = self.dx_filter.filter(dx, alpha=self.compute_alpha(self.d_cutoff, dt))
-        cutoff = self.min_cutoff + self.beta * np.linalg.norm(edx)
-        return self.x_filter.filter(x, alpha=self.compute_alpha(cutoff, dt))
 
 class TrajectoryProcessor:
-    def __init__(self, save_folder_path=None):
+    # 固定属性集合：实例无 __dict__，逐帧访问 self.xxx 走槽位描述符
+    __slots__ = (
+        "config", "one_euro_filter", "landing_analyzer", "recorder", "_interpolator",
+        "last_valid_pos", "last_valid_time", "velocity",
+        "_max_jump_distance", "_max_jump_sq", "timeout_threshold", "default_dt",
+        "prev_pos", "prev_time", "frame_count",
+        "is_evaluating", "_serve_cap", "_pos_buf", "_time_buf", "_serve_n",
+    )
+
+    def __init__(self, save_folder_path=None, config=DEFAULT_CONFIG):
+        self.config = config
+
         # 1. 滤波器初始化
-        self.one_euro_filter = OneEuroFilter(min_cutoff=1.5, beta=0.15, d_cutoff=1.5)
-        self.interpolator = TrajectoryInterpolator()
+        self.one_euro_filter = OneEuroFilter(
+            min_cutoff=config.min_cutoff, beta=config.beta, d_cutoff=config.d_cutoff
+        )
+        # 在构造处理器时（GUI线程启动阶段）完成内核编译，而不是在第一条实时消息上
+        warmup()
         self.landing_analyzer = LandingAnalyzer(save_folder_path)
         self.recorder = TrajectoryRecorder(save_folder_path, use_simulator_format=True)
+        self._interpolator = None  # 首次访问 interpolator 时才创建
         
         # 2. 核心状态变量 (必须在此全部初始化)
         self.last_valid_pos = None
         self.last_valid_time = 0.0      # <--- 确保这一行存在
-        self.velocity = np.zeros(3)      # 3D 速度矢量
-        self.max_jump_distance = 1500.0  # 增大阈值以容纳高速杀球
-        self.timeout_threshold = 0.5     # 断流判定阈值
+        self.velocity = _ZERO3           # 3D 速度矢量 (vx, vy, vz)
+        self.max_jump_distance = config.max_jump_distance
+        self.timeout_threshold = config.timeout_threshold
+        self.default_dt = config.default_dt
         
         self.prev_pos = None
         self.prev_time = None
         self.frame_count = 0
 
         self.is_evaluating = False
-        self.current_serve_buffer = []  # 用于存储当前发球的轨迹点序列
+        # 当前发球的轨迹点序列：位置和时间分别存放在预分配数组中（SoA），前 _serve_n 个有效；
+        # 坐标为毫米级精度，float32足够，时间戳需保留float64
+        self._serve_cap = 2048
+        self._pos_buf = np.empty((self._serve_cap, 3), dtype=np.float32)
+        self._time_buf = np.empty(self._serve_cap, dtype=np.float64)
+        self._serve_n = 0
+
+    @property
+    def interpolator(self):
+        """轨迹插值器：实时处理路径不使用，首次访问时才创建"""
+        if self._interpolator is None:
+            # 插值模块只在这里用到，延迟到首次访问时再导入
+            from .interpolation import TrajectoryInterpolator
+
+            self._interpolator = TrajectoryInterpolator()
+        return self._interpolator
+
+    @property
+    def max_jump_distance(self):
+        """噪点判定的最大偏离距离(mm)"""
+        return self._max_jump_distance
+
+    @max_jump_distance.setter
+    def max_jump_distance(self, value):
+        # 同步更新平方阈值，每帧判定时直接比较距离平方
+        self._max_jump_distance = value
+        self._max_jump_sq = value * value
 
     def process_realtime_step(self, raw_pos, timestamp):
-        """核心算法逻辑：断流检测 -> 预测去噪 -> 动态滤波 -> 状态更新"""
-        pos = np.array(raw_pos)
+        """核心算法逻辑：断流检测 -> 预测去噪 -> 动态滤波 -> 状态更新
+
+        raw_pos 可以是长度为3的 ndarray（调用方可复用缓冲区）、列表或元组。
+
+        返回的 filtered_pos 每帧新建，同时作为 prev_pos 保存并传给记录器和落点分析器，
+        不做防御性复制：调用方和下游分析只能读取，不得原地修改。
+        """
+        # 取出三个分量作为快照：之后调用方可立即复用其缓冲区，本帧不再创建ndarray
+        x0, x1, x2 = raw_pos
         self.frame_count += 1
         
         # A. 计算时间步长并检查是否为断流后的“新回合”
@@ -82,71 +130,108 @@ class TrajectoryProcessor:
             dt = timestamp - self.last_valid_time
             if dt > self.timeout_threshold:
                 is_new_session = True
-                dt = 0.033 
+                dt = self.default_dt
         else:
-            dt = 0.033
+            dt = self.default_dt
             is_new_session = True
 
-        # B. 运动模型去噪 (仅在连续追踪时生效)
-        if not is_new_session and self.last_valid_pos is not None:
-            predicted_pos = self.last_valid_pos + self.velocity * dt
-            actual_dist = np.linalg.norm(pos - predicted_pos)
-            
-            # 如果偏离预测位置过远，判定为噪点
-            if actual_dist > self.max_jump_distance:
-                return None, 0, {"frame_count": self.frame_count, "timeout": False}
-
-        # C. 状态重置：若是新回合，清空滤波器历史，防止产生错误的瞬时高位移
-        if is_new_session:
-            self.velocity = np.zeros(3)
-            self.one_euro_filter.last_timestamp = None 
-            self.one_euro_filter.x_filter.s = None
-            self.one_euro_filter.dx_filter.s = None
-
-        # D. 动态滤波平滑
-        filtered_pos = self.one_euro_filter.filter(pos, timestamp)
-        
-        # E. 更新速度矢量
-        speed = 0
-        if self.last_valid_pos is not None and dt > 0:
-            current_v = (filtered_pos - self.last_valid_pos) / dt
-            if is_new_session:
-                self.velocity = current_v
-            else:
-                self.velocity = 0.8 * current_v + 0.2 * self.velocity
-            speed = np.linalg.norm(self.velocity)
+        # B-E. 预测去噪、动态滤波、速度更新在一个内核中完成：
+        #      新回合时内核以本帧重置滤波器和速度，防止产生错误的瞬时高位移
+        f = self.one_euro_filter
+        lvp = self.last_valid_pos
+        has_prev = lvp is not None
+        l0, l1, l2 = lvp if has_prev else _ZERO3
+        v0, v1, v2 = self.velocity
+        s0, s1, s2 = f.s
+        ds0, ds1, ds2 = f.ds
+        filter_dt = 0.0 if is_new_session else timestamp - f.last_timestamp
+        rejected, s0, s1, s2, ds0, ds1, ds2, v0, v1, v2, speed = step_core(
+            x0, x1, x2, has_prev, l0, l1, l2, v0, v1, v2,
+            s0, s1, s2, ds0, ds1, ds2, filter_dt, dt, is_new_session,
+            self._max_jump_sq, f.min_cutoff, f.beta, f.d_cutoff,
+        )
+        # 如果偏离预测位置过远，判定为噪点，状态保持不变
+        if rejected:
+            return None, 0, RealtimeEvents()
+
+        # 回写滤波器和速度状态
+        if is_new_session or filter_dt > 0:
+            f.last_timestamp = timestamp
+        smoothed = (s0, s1, s2)
+        f.s = smoothed
+        f.ds = (ds0, ds1, ds2)
+        self.velocity = (v0, v1, v2)
+
+        # 构造本帧新的数组供下游使用
+        filtered_pos = _array(smoothed)
         
-        # F. 速度分析与落点检测
+        # F. 速度分析与落点检测：记录器每帧都要更新速度统计和趋势状态（含死区判断），
+        #    不能按Y方向是否翻转跳过；prev_pos 与 prev_time 总是同时赋值和清空，只需判断一个
         y_trend_changed = False
-        if self.prev_pos is not None and self.prev_time is not None:
+        prev_time = self.prev_time
+        if prev_time is not None:
             _, y_trend_changed, _ = self.recorder.analyze_speed_and_trend(
-                filtered_pos, self.prev_pos, timestamp, self.prev_time
+                filtered_pos, self.prev_pos, timestamp, prev_time
             )
 
+        # 发球评估期间记录轨迹点
+        if self.is_evaluating:
+            self._append_serve_point(filtered_pos, timestamp)
+
         landing_detected = False
         if filtered_pos[2] < 80:
             landing_detected = self.landing_analyzer.analyze_realtime_landing(filtered_pos, timestamp)
 
-        # G. 更新历史状态
-        self.prev_pos = filtered_pos.copy()
+        # G. 更新历史状态：filtered_pos 每帧新建且约定只读，直接引用无需复制；
+        #    last_valid_pos 只在本类内部使用，保存为滤波器返回的不可变元组
+        self.prev_pos = filtered_pos
         self.prev_time = timestamp
-        self.last_valid_pos = filtered_pos.copy()
+        self.last_valid_pos = smoothed
         self.last_valid_time = timestamp
 
-        events = {
-            "landing_detected": landing_detected,
-            "y_trend_changed": y_trend_changed,
-            "shot_count": self.recorder.get_shot_count(),
-            "frame_count": self.frame_count,
-            "timeout": False
-        }
+        events = RealtimeEvents(
+            shot_count=self.recorder.get_shot_count(),
+            y_trend_changed=y_trend_changed,
+            landing_detected=landing_detected,
+        )
         return filtered_pos, speed, events
 
+    def process_batch(self, raw_positions, timestamps):
+        """批量处理一段已缓存的轨迹（离线回放、发球分析），不修改实时处理状态
+
+        在相邻帧间隔超过断流阈值处切分回合，各回合相互独立，由并行内核处理。
+        与逐帧处理的差别：每个回合首帧不再用上一回合末点计算跨回合速度，速度记为0，
+        随后几帧的速度因平滑衰减而略有差异，坐标和噪点判定结果相同。
+
+        Args:
+            raw_positions: (N, 3) 原始坐标
+            timestamps: (N,) 时间戳
+        Returns:
+            (filtered, speeds, landing_mask, trend_mask)：
+            filtered 中被判为噪点的帧为NaN；landing_mask 为 Z<80 的落点候选帧；
+            trend_mask 为Y方向趋势变化的帧（拍数仍以 TrajectoryRecorder 的统计为准）
+        """
+        positions = np.ascontiguousarray(raw_positions, dtype=np.float64)
+        timestamps = np.ascontiguousarray(timestamps, dtype=np.float64)
+        n = len(timestamps)
+
+        breaks = np.flatnonzero(np.diff(timestamps) > self.timeout_threshold) + 1
+        seg_bounds = np.concatenate(([0], breaks, [n])).astype(np.int64)
+
+        f = self.one_euro_filter
+        filtered, speeds, trend_mask = filter_segments(
+            positions, timestamps, seg_bounds,
+            self._max_jump_sq, self.timeout_threshold, self.default_dt,
+            f.min_cutoff, f.beta, f.d_cutoff,
+        )
+        landing_mask = filtered[:, 2] < 80
+        return filtered, speeds, landing_mask, trend_mask
+
     def reset(self):
         """完全重置处理器状态"""
         self.last_valid_pos = None
         self.last_valid_time = 0.0
-        self.velocity = np.zeros(3)
+        self.velocity = _ZERO3
         self.prev_pos = None
         self.prev_time = None
         self.frame_count = 0
@@ -155,38 +240,52 @@ class TrajectoryProcessor:
     def start_serve_session(self):
         """开启发球采集"""
         self.is_evaluating = True
-        self.current_serve_buffer = []
+        self._serve_n = 0
         print("🚀 发球监控已就绪...")
 
     def stop_serve_session(self):
         """结束采集并返回结果"""
         self.is_evaluating = False
-        if not self.current_serve_buffer:
+        if not self._serve_n:
             return None
         
         result = self.analyze_current_serve()
-        self.current_serve_buffer = []
+        self._serve_n = 0
         return result
 
+    def _append_serve_point(self, pos, timestamp):
+        """写入一个发球轨迹点，容量不足时按倍数扩容"""
+        n = self._serve_n
+        if n == self._serve_cap:
+            self._serve_cap *= 2
+            self._pos_buf = np.resize(self._pos_buf, (self._serve_cap, 3))
+            self._time_buf = np.resize(self._time_buf, self._serve_cap)
+        self._pos_buf[n] = pos
+        self._time_buf[n] = timestamp
+        self._serve_n = n + 1
+
     def analyze_current_serve(self):
         """分析缓冲区内的发球质量"""
-        if len(self.current_serve_buffer) < 5:
+        n = self._serve_n
+        if n < 5:
             return None
 
-        # 提取位置和时间
-        positions = np.array([p['pos'] for p in self.current_serve_buffer])
-        times = np.array([p['time'] for p in self.current_serve_buffer])
+        # 提取位置和时间（直接取缓冲区的有效部分，不复制）
+        positions = self._pos_buf[:n]
+        times = self._time_buf[:n]
         
         # 计算特征
-        # 1. 峰值速度 (m/s)
-        deltas = np.diff(positions, axis=0) / 1000.0 # 转为米
+        # 1. 峰值速度 (m/s)：整段向量化计算，dt<=0 的片段用掩码剔除
+        deltas = np.diff(positions, axis=0) * np.float32(1e-3) # 转为米，保持float32
         dts = np.diff(times)
-        speeds = [np.linalg.norm(d)/dt for d, dt in zip(deltas, dts) if dt > 0]
-        max_speed = max(speeds) if speeds else 0
-        avg_speed = np.mean(speeds) if speeds else 0
+        mask = dts > 0
+        speeds = np.linalg.norm(deltas, axis=1) / np.where(mask, dts, 1.0)
+        speeds = speeds[mask]
+        max_speed = float(speeds.max()) if speeds.size else 0.0
+        avg_speed = float(speeds.mean()) if speeds.size else 0.0
 
         # 2. 轨迹弧度 (最高点高度)
-        max_height = np.max(positions[:, 2])
+        max_height = float(np.max(positions[:, 2]))
 
         # 3. 落点 (最后一个有效点，或高度最低点)
         landing_point = positions[-1] 
@@ -195,10 +294,10 @@ class TrajectoryProcessor:
             "max_speed": max_speed,
             "avg_speed": avg_speed,
             "max_height": max_height,
-            "landing_x": landing_point[0],
-            "landing_y": landing_point[1],
+            "landing_x": float(landing_point[0]),
+            "landing_y": float(landing_point[1]),
             "trajectory": positions.tolist(), # 用于回放
-            "timestamp": times[0]
+            "timestamp": float(times[0])
         }
     
     def get_serve_features(self, points):
@@ -206,18 +305,20 @@ class TrajectoryProcessor:
         if len(points) < 5:
             return None
         
-        pos_array = np.array([p['pos'] for p in points])
-        time_array = np.array([p['time'] for p in points])
+        pos_array = np.asarray([p['pos'] for p in points], dtype=np.float32)
+        time_array = np.fromiter((p['time'] for p in points), dtype=np.float64, count=len(points))
         
-        # 1. 计算峰值速度 (m/s)
-        dist = np.linalg.norm(np.diff(pos_array, axis=0), axis=1) / 1000.0
+        # 1. 计算峰值速度 (m/s)：einsum一次完成逐段平方求和，不生成中间的 d*d 数组
+        deltas = np.diff(pos_array, axis=0)
+        dist = np.sqrt(np.einsum('ij,ij->i', deltas, deltas)) / 1000.0
         dt = np.diff(time_array)
         dt[dt == 0] = 0.001 # 防止除零
         speeds = dist / dt
-        max_speed = np.max(speeds)
+        max_speed = float(np.max(speeds))
+        total_distance = float(dist.sum())  # 总飞行距离 (m)
         
         # 2. 轨迹最高点 (mm)
-        peak_height = np.max(pos_array[:, 2])
+        peak_height = float(np.max(pos_array[:, 2]))
         
         # 3. 最终落点 (评估精度)
         landing_pos = pos_array[-1]
@@ -225,7 +326,8 @@ class TrajectoryProcessor:
         return {
             "max_speed": max_speed,
             "peak_height": peak_height,
-            "landing_x": landing_pos[0],
-            "landing_y": landing_pos[1],
-            "duration": time_array[-1] - time_array[0]
+            "landing_x": float(landing_pos[0]),
+            "landing_y": float(landing_pos[1]),
+            "total_distance": total_distance,
+            "duration": float(time_array[-1] - time_array[0])
         }
\ No newline at end of file